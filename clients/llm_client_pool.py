@@ -0,0 +1,263 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncGenerator, AsyncIterator, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+import httpx
+import numpy as np
+from autogen_core import CancellationToken
+from autogen_core.models import ChatCompletionClient, CreateResult, LLMMessage, ModelCapabilities, ModelInfo, RequestUsage
+from autogen_core.tools import Tool, ToolSchema
+from autogen_ext.models.openai import OpenAIChatCompletionClient
+
+from utilities.logging_utils import configure_logger
+
+logger = configure_logger('llm_client_pool_logger', logging.INFO)
+
+# Loop time at which the caller of the current turn stopped speaking, None for background requests
+llm_turn_started_at: ContextVar[Optional[float]] = ContextVar('llm_turn_started_at', default=None)
+
+
+def start_interactive_turn():
+    """Mark LLM requests made from the current context as part of a turn a caller is waiting on."""
+    llm_turn_started_at.set(time.monotonic())
+
+
+def start_background_work():
+    """Mark LLM requests made from the current context as background work, served after every waiting turn."""
+    llm_turn_started_at.set(None)
+
+
+class LlmOverloadedError(Exception):
+    pass
+
+
+class LlmBackend:
+    """
+    One model endpoint: a concurrency limit, the requests waiting for a slot and latency metrics.
+
+    Waiting requests are served by priority. Turns a caller is waiting on go first, oldest turn first (the
+    caller who stopped speaking longest ago), so a turn's follow-up requests are not starved by newer turns.
+    Background work (e.g. summaries) runs when no turn is waiting. Requests waiting longer than max_queue_wait
+    are rejected rather than piling up, and requests running longer than request_timeout are abandoned.
+    """
+
+    def __init__(self, name: str, max_concurrency: int, max_queue_wait: float, request_timeout: float, metrics_window: int = 1000):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue_wait = max_queue_wait
+        self.request_timeout = request_timeout
+
+        self.active = 0
+        self.waiting: List[Tuple[Tuple[int, float], int, asyncio.Future]] = []
+        self.sequence = itertools.count()
+
+        self.queue_waits: deque = deque(maxlen=metrics_window)
+        self.service_times: deque = deque(maxlen=metrics_window)
+        self.completed = 0
+        self.timed_out = 0
+        self.rejected = 0
+
+    @asynccontextmanager
+    async def request(self) -> AsyncIterator[float]:
+        """Hold a slot for one request, yields the loop time by which the request must finish."""
+        queued_at = time.monotonic()
+        await self._acquire()
+        started_at = time.monotonic()
+        self.queue_waits.append(started_at - queued_at)
+        try:
+            yield asyncio.get_running_loop().time() + self.request_timeout
+            self.completed += 1
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            logger.warning(f"LLM request to {self.name} timed out after {self.request_timeout:.1f}s")
+            raise
+        finally:
+            self.service_times.append(time.monotonic() - started_at)
+            self._release()
+
+    async def _acquire(self):
+        # Drop requests that gave up waiting, live waiters only exist while every slot is taken
+        while self.waiting and self.waiting[0][2].done():
+            heapq.heappop(self.waiting)
+
+        if self.active < self.max_concurrency and not self.waiting:
+            self.active += 1
+            return
+
+        turn_started_at = llm_turn_started_at.get()
+        priority = (0, turn_started_at) if turn_started_at is not None else (1, time.monotonic())
+        slot = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.waiting, (priority, next(self.sequence), slot))
+        try:
+            await asyncio.wait_for(slot, timeout=self.max_queue_wait)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise LlmOverloadedError(f"No {self.name} slot within {self.max_queue_wait:.1f}s ({len(self.waiting)} requests waiting)")
+        except asyncio.CancelledError:
+            # The slot may have been handed over just as the request was cancelled
+            if slot.done() and not slot.cancelled():
+                self._release()
+            raise
+
+    def _release(self):
+        # Hand the slot straight to the highest priority request still waiting
+        while self.waiting:
+            _, _, slot = heapq.heappop(self.waiting)
+            if not slot.done():
+                slot.set_result(None)
+                return
+        self.active -= 1
+
+    def metrics(self) -> Dict[str, Any]:
+        queue_waits = np.array(self.queue_waits) if self.queue_waits else np.zeros(1)
+        service_times = np.array(self.service_times) if self.service_times else np.zeros(1)
+        return {
+            "active": self.active,
+            "waiting": sum(1 for _, _, slot in self.waiting if not slot.done()),
+            "completed": self.completed,
+            "timed_out": self.timed_out,
+            "rejected": self.rejected,
+            "queue_wait_p50": float(np.percentile(queue_waits, 50)),
+            "queue_wait_p95": float(np.percentile(queue_waits, 95)),
+            "service_time_p50": float(np.percentile(service_times, 50)),
+            "service_time_p95": float(np.percentile(service_times, 95))
+        }
+
+
+class PooledChatCompletionClient(ChatCompletionClient):
+    """Model client that sends every request through its backend's slots and timeout."""
+
+    def __init__(self, client: ChatCompletionClient, backend: LlmBackend):
+        self.client = client
+        self.backend = backend
+
+    async def create(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        json_output: Optional[bool] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> CreateResult:
+        async with self.backend.request():
+            return await asyncio.wait_for(
+                self.client.create(messages, tools=tools, json_output=json_output, extra_create_args=extra_create_args,
+                                   cancellation_token=cancellation_token),
+                timeout=self.backend.request_timeout
+            )
+
+    async def create_stream(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        json_output: Optional[bool] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> AsyncGenerator[Union[str, CreateResult], None]:
+        async with self.backend.request() as deadline:
+            stream = self.client.create_stream(messages, tools=tools, json_output=json_output, extra_create_args=extra_create_args,
+                                               cancellation_token=cancellation_token)
+            try:
+                while True:
+                    # The stream is read in this task, the deadline covers the whole response
+                    try:
+                        async with asyncio.timeout_at(deadline):
+                            chunk = await anext(stream)
+                    except StopAsyncIteration:
+                        break
+                    yield chunk
+            finally:
+                await stream.aclose()
+
+    def actual_usage(self) -> RequestUsage:
+        return self.client.actual_usage()
+
+    def total_usage(self) -> RequestUsage:
+        return self.client.total_usage()
+
+    def count_tokens(self, messages: Sequence[LLMMessage], *, tools: Sequence[Tool | ToolSchema] = []) -> int:
+        return self.client.count_tokens(messages, tools=tools)
+
+    def remaining_tokens(self, messages: Sequence[LLMMessage], *, tools: Sequence[Tool | ToolSchema] = []) -> int:
+        return self.client.remaining_tokens(messages, tools=tools)
+
+    @property
+    def capabilities(self) -> ModelCapabilities:  # type: ignore
+        return self.client.capabilities
+
+    @property
+    def model_info(self) -> ModelInfo:
+        return self.client.model_info
+
+
+class LlmClientPool:
+    """
+    Shared model clients. Each backend (the OpenAI API or a base URL such as the local Ollama server) has one
+    pooled keep-alive HTTP connection pool and one set of slots shared by every model client that uses it.
+    """
+
+    def __init__(self, max_queue_wait: float = 10.0, request_timeout: float = 30.0):
+        self.max_queue_wait = max_queue_wait
+        self.request_timeout = request_timeout
+        self.backends: Dict[str, LlmBackend] = {}
+        self.http_clients: Dict[str, httpx.AsyncClient] = {}
+        self.clients: Dict[Tuple[str, str], PooledChatCompletionClient] = {}
+
+    def get_client(self,
+                   model: str,
+                   base_url: Optional[str] = None,
+                   max_concurrency: int = 8,
+                   **client_args) -> PooledChatCompletionClient:
+        """Shared client for the model, the backend's concurrency limit is set by its first client."""
+        backend_name = base_url or "openai"
+        backend = self.backends.get(backend_name)
+        if backend is not None and backend.max_concurrency != max_concurrency:
+            # The limit is shared by the backend's HTTP connection pool, which cannot be resized once created
+            logger.warning(f"LLM backend {backend_name} is already limited to {backend.max_concurrency} concurrent requests, "
+                           f"ignoring max_concurrency={max_concurrency} requested for {model}")
+
+        client = self.clients.get((backend_name, model))
+        if client is not None:
+            return client
+
+        if backend is None:
+            backend = LlmBackend(backend_name, max_concurrency, self.max_queue_wait, self.request_timeout)
+            self.backends[backend_name] = backend
+            self.http_clients[backend_name] = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency),
+                timeout=self.request_timeout
+            )
+            logger.info(f"LLM backend {backend_name} limited to {max_concurrency} concurrent requests")
+
+        if base_url is not None:
+            client_args["base_url"] = base_url
+        client = PooledChatCompletionClient(
+            OpenAIChatCompletionClient(model=model, http_client=self.http_clients[backend_name], max_retries=0, **client_args),
+            backend
+        )
+        self.clients[(backend_name, model)] = client
+        return client
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        return {backend_name: backend.metrics() for backend_name, backend in self.backends.items()}
+
+
+_pool: Optional[LlmClientPool] = None
+
+def get_llm_client_pool() -> LlmClientPool:
+    global _pool
+    if _pool is None:
+        _pool = LlmClientPool(
+            max_queue_wait=float(os.getenv('LLM_MAX_QUEUE_WAIT_SECONDS', '10')),
+            request_timeout=float(os.getenv('LLM_REQUEST_TIMEOUT_SECONDS', '30'))
+        )
+    return _pool
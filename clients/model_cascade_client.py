@@ -0,0 +1,279 @@
+import asyncio
+import json
+import logging
+import time
+from contextlib import aclosing
+from typing import Any, AsyncGenerator, Callable, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+from autogen_core import CancellationToken
+from autogen_core.models import ChatCompletionClient, CreateResult, LLMMessage, ModelCapabilities, ModelInfo, RequestUsage
+from autogen_core.tools import Tool, ToolSchema
+
+from utilities.logging_utils import configure_logger
+
+logger = configure_logger('model_cascade_client_logger', logging.INFO)
+
+
+class ModelUsageLedger:
+    """Token and latency accounting of each call's model requests, by model."""
+
+    def __init__(self):
+        self.calls: Dict[str, Dict[str, Dict[str, float]]] = {}
+
+    def record(self,
+               call_id: str,
+               model: str,
+               usage: Optional[RequestUsage],
+               latency: float,
+               first_chunk_latency: Optional[float] = None,
+               failed: bool = False,
+               escalated: bool = False):
+        models = self.calls.setdefault(call_id, {})
+        stats = models.setdefault(model, {
+            "requests": 0, "failed": 0, "escalated": 0, "prompt_tokens": 0, "completion_tokens": 0,
+            "latency_seconds": 0.0, "streamed_requests": 0, "first_chunk_latency_seconds": 0.0
+        })
+        stats["requests"] += 1
+        stats["failed"] += int(failed)
+        stats["escalated"] += int(escalated)
+        if usage is not None:
+            stats["prompt_tokens"] += usage.prompt_tokens
+            stats["completion_tokens"] += usage.completion_tokens
+        stats["latency_seconds"] += latency
+        if first_chunk_latency is not None:
+            stats["streamed_requests"] += 1
+            stats["first_chunk_latency_seconds"] += first_chunk_latency
+
+    def usage(self, call_id: str) -> Dict[str, Dict[str, float]]:
+        """The call's totals per model, with mean latencies."""
+        usage = {}
+        for model, stats in self.calls.get(call_id, {}).items():
+            usage[model] = dict(stats)
+            usage[model]["mean_latency_seconds"] = stats["latency_seconds"] / stats["requests"]
+            if stats["streamed_requests"]:
+                usage[model]["mean_first_chunk_latency_seconds"] = stats["first_chunk_latency_seconds"] / stats["streamed_requests"]
+        return usage
+
+    def end_call(self, call_id: str) -> Dict[str, Dict[str, float]]:
+        """The call's final usage, after which it is no longer tracked."""
+        usage = self.usage(call_id)
+        self.calls.pop(call_id, None)
+        return usage
+
+    def metrics(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        return {call_id: self.usage(call_id) for call_id in list(self.calls)}
+
+
+_ledger: Optional[ModelUsageLedger] = None
+
+def get_model_usage_ledger() -> ModelUsageLedger:
+    global _ledger
+    if _ledger is None:
+        _ledger = ModelUsageLedger()
+    return _ledger
+
+
+class CascadingChatCompletionClient(ChatCompletionClient):
+    """
+    Model client that sends each request to the cheapest model likely to handle it and escalates to the next,
+    more capable model when its response does not validate: an empty reply, a reply missing the stop word (other
+    than an allowed bare message such as "AUTHENTICATED"), or a tool call naming an unknown tool or with arguments
+    that are not a JSON object. A failed request (overload, timeout, error) only escalates when the next model is
+    served by another backend, retrying on the same saturated backend would only add to its load.
+
+    Streamed text cannot be taken back once spoken, so below the last tier the first stream_validation_chars of a
+    reply are held back: a reply ending within them is validated whole and escalated like a non-streamed one,
+    longer replies are forwarded as they arrive from then on. A streamed reply is only escalated when nothing was
+    forwarded yet, one only missing the stop word gets it appended instead, ending the turn as the model intended.
+    Every request is recorded in the model usage ledger under the call it belongs to.
+    """
+
+    def __init__(self,
+                 tiers: Sequence[Tuple[str, ChatCompletionClient]],  # Cheapest first
+                 select_tier: Callable[[Sequence[LLMMessage]], int],  # Index of the tier to start a request at
+                 call_id: str,
+                 stop_word: Optional[str] = "TERMINATE",
+                 allowed_messages: Tuple[str, ...] = (),
+                 stream_validation_chars: int = 0,  # Streamed text held back for validation below the last tier
+                 ledger: Optional[ModelUsageLedger] = None):
+        self.tiers = list(tiers)
+        self.select_tier = select_tier
+        self.call_id = call_id
+        self.stop_word = stop_word
+        self.allowed_messages = allowed_messages
+        self.stream_validation_chars = stream_validation_chars
+        self.ledger = ledger or get_model_usage_ledger()
+        self._actual_usage = RequestUsage(prompt_tokens=0, completion_tokens=0)
+        self._total_usage = RequestUsage(prompt_tokens=0, completion_tokens=0)
+
+    async def create(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        json_output: Optional[bool] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> CreateResult:
+        tier = self._start_tier(messages)
+        while True:
+            model, client = self.tiers[tier]
+            last_tier = tier == len(self.tiers) - 1
+            started_at = time.monotonic()
+            try:
+                result = await client.create(messages, tools=tools, json_output=json_output, extra_create_args=extra_create_args,
+                                             cancellation_token=cancellation_token)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                escalate = self._can_escalate_on_failure(tier)
+                self.ledger.record(self.call_id, model, None, time.monotonic() - started_at, failed=True, escalated=escalate)
+                if not escalate:
+                    raise
+                logger.warning(f"Call {self.call_id}: {model} request failed, escalating: {str(e)}")
+                tier += 1
+                continue
+
+            error = self._validation_error(result, tools)
+            self.ledger.record(self.call_id, model, result.usage, time.monotonic() - started_at,
+                               failed=error is not None, escalated=error is not None and not last_tier)
+            self._add_usage(result.usage)
+            if error is None or last_tier:
+                return result
+
+            logger.warning(f"Call {self.call_id}: {model} response failed validation ({error}), escalating")
+            tier += 1
+
+    async def create_stream(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        json_output: Optional[bool] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> AsyncGenerator[Union[str, CreateResult], None]:
+        tier = self._start_tier(messages)
+        while True:
+            model, client = self.tiers[tier]
+            last_tier = tier == len(self.tiers) - 1
+            started_at = time.monotonic()
+            first_chunk_latency = None
+            result = None
+            held_back: List[str] = []  # Chunks not forwarded yet, until stream_validation_chars are received
+            holding_back = not last_tier and self.stream_validation_chars > 0
+            streamed = False
+            try:
+                async with aclosing(client.create_stream(messages, tools=tools, json_output=json_output, extra_create_args=extra_create_args,
+                                                         cancellation_token=cancellation_token)) as stream:
+                    async for item in stream:
+                        if isinstance(item, CreateResult):
+                            result = item
+                        elif item:
+                            if first_chunk_latency is None:
+                                first_chunk_latency = time.monotonic() - started_at
+                            if holding_back:
+                                held_back.append(item)
+                                if sum(len(chunk) for chunk in held_back) < self.stream_validation_chars:
+                                    continue
+                                holding_back = False
+                            streamed = True
+                            for chunk in held_back or [item]:
+                                yield chunk
+                            held_back = []
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                escalate = not streamed and self._can_escalate_on_failure(tier)
+                self.ledger.record(self.call_id, model, None, time.monotonic() - started_at, first_chunk_latency, failed=True, escalated=escalate)
+                if not escalate:
+                    raise
+                logger.warning(f"Call {self.call_id}: {model} request failed, escalating: {str(e)}")
+                tier += 1
+                continue
+
+            error = "no result" if result is None else self._validation_error(result, tools)
+            escalate = error is not None and not streamed and not last_tier
+            self.ledger.record(self.call_id, model, result.usage if result is not None else None, time.monotonic() - started_at,
+                               first_chunk_latency, failed=error is not None, escalated=escalate)
+            if result is not None:
+                self._add_usage(result.usage)
+
+            if escalate:
+                logger.warning(f"Call {self.call_id}: {model} response failed validation ({error}), escalating")
+                tier += 1
+                continue
+
+            for chunk in held_back:
+                yield chunk
+
+            if error is not None:
+                logger.warning(f"Call {self.call_id}: {model} response failed validation ({error})")
+                if result is not None and isinstance(result.content, str) and self.stop_word and result.content.strip():
+                    result = result.model_copy(update={"content": f"{result.content.rstrip()} {self.stop_word}"})
+            if result is not None:
+                yield result
+            return
+
+    def _start_tier(self, messages: Sequence[LLMMessage]) -> int:
+        return min(max(self.select_tier(messages), 0), len(self.tiers) - 1)
+
+    @staticmethod
+    def _backend(client: ChatCompletionClient) -> Optional[str]:
+        """Name of the backend serving a pooled client, None when unknown."""
+        return getattr(getattr(client, "backend", None), "name", None)
+
+    def _can_escalate_on_failure(self, tier: int) -> bool:
+        """Whether a failed request can move to the next tier, only when it is served by a different backend."""
+        if tier == len(self.tiers) - 1:
+            return False
+        backend, next_backend = self._backend(self.tiers[tier][1]), self._backend(self.tiers[tier + 1][1])
+        return backend is None or next_backend is None or backend != next_backend
+
+    def _validation_error(self, result: CreateResult, tools: Sequence[Tool | ToolSchema]) -> Optional[str]:
+        if isinstance(result.content, str):
+            text = result.content.strip()
+            if not text:
+                return "empty response"
+            if self.stop_word and self.stop_word not in text and text not in self.allowed_messages:
+                return f"missing {self.stop_word}"
+            return None
+
+        tool_names = {tool["name"] if isinstance(tool, dict) else tool.name for tool in tools}
+        for function_call in result.content:
+            if function_call.name not in tool_names:
+                return f"unknown tool {function_call.name}"
+            try:
+                arguments = json.loads(function_call.arguments or "{}")
+            except json.JSONDecodeError:
+                return f"malformed arguments for {function_call.name}"
+            if not isinstance(arguments, dict):
+                return f"malformed arguments for {function_call.name}"
+        return None
+
+    def _add_usage(self, usage: RequestUsage):
+        self._actual_usage = RequestUsage(prompt_tokens=self._actual_usage.prompt_tokens + usage.prompt_tokens,
+                                          completion_tokens=self._actual_usage.completion_tokens + usage.completion_tokens)
+        self._total_usage = RequestUsage(prompt_tokens=self._total_usage.prompt_tokens + usage.prompt_tokens,
+                                         completion_tokens=self._total_usage.completion_tokens + usage.completion_tokens)
+
+    def actual_usage(self) -> RequestUsage:
+        return self._actual_usage
+
+    def total_usage(self) -> RequestUsage:
+        return self._total_usage
+
+    # Token counts and capabilities are those of the most capable model, the one every request can end up at
+    def count_tokens(self, messages: Sequence[LLMMessage], *, tools: Sequence[Tool | ToolSchema] = []) -> int:
+        return self.tiers[-1][1].count_tokens(messages, tools=tools)
+
+    def remaining_tokens(self, messages: Sequence[LLMMessage], *, tools: Sequence[Tool | ToolSchema] = []) -> int:
+        return self.tiers[-1][1].remaining_tokens(messages, tools=tools)
+
+    @property
+    def capabilities(self) -> ModelCapabilities:  # type: ignore
+        return self.tiers[-1][1].capabilities
+
+    @property
+    def model_info(self) -> ModelInfo:
+        return self.tiers[-1][1].model_info
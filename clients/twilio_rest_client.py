@@ -1,6 +1,11 @@
+import asyncio
 import logging
 import os
+import random
+from typing import Dict, List, Optional, Tuple
 
+from twilio.base.exceptions import TwilioRestException
+from twilio.http.async_http_client import AsyncTwilioHttpClient
 from twilio.rest import Client
 from twilio.twiml.voice_response import VoiceResponse
 
@@ -8,64 +13,119 @@ from utilities.logging_utils import configure_logger
 
 logger = configure_logger('twilio_rest_client_logger', logging.INFO)
 
-def speak_on_call(call_sid: str, text_to_speak: str):
+
+class AsyncTwilioRestClient:
+    """
+    Long lived async Twilio client. The aiohttp session behind it pools and keeps connections alive, every
+    request has a timeout and failed requests are retried with exponential backoff and full jitter.
+
+    Call updates are coalesced per call: each update replaces all TwiML running on the call, so while one
+    update is waiting or in flight only the newest pending update for that call is sent. An interrupt
+    immediately followed by a play becomes a single play, and superseded updates are dropped (their callers
+    get the result of the update that replaced them).
+    """
+
+    def __init__(self,
+                 timeout: float = 5.0,
+                 max_retries: int = 2,
+                 retry_base_delay: float = 0.2,
+                 coalesce_window: float = 0.05):  # Seconds to wait for a superseding update before sending
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.coalesce_window = coalesce_window
+
+        self.client = Client(os.environ['TWILIO_ACCOUNT_SID'],
+                             os.environ['TWILIO_AUTH_TOKEN'],
+                             http_client=AsyncTwilioHttpClient(pool_connections=True, timeout=timeout))
+
+        self.pending_updates: Dict[str, Tuple[str, str, List[asyncio.Future]]] = {}
+        self.flush_tasks: Dict[str, asyncio.Task] = {}
+
+    async def update_call(self, call_sid: str, twiml: VoiceResponse, description: str) -> bool:
+        """Queue new TwiML for the call, returns whether it (or an update that superseded it) was applied."""
+        future = asyncio.get_running_loop().create_future()
+
+        superseded = self.pending_updates.pop(call_sid, None)
+        waiters = [future]
+        if superseded is not None:
+            logger.info(f"Coalescing update for call {call_sid}: '{superseded[1]}' superseded by '{description}'")
+            waiters = superseded[2] + waiters
+        self.pending_updates[call_sid] = (twiml.to_xml(), description, waiters)
+
+        flush_task = self.flush_tasks.get(call_sid)
+        if flush_task is None or flush_task.done():
+            self.flush_tasks[call_sid] = asyncio.create_task(self._flush(call_sid))
+
+        return await future
+
+    async def _flush(self, call_sid: str):
+        await asyncio.sleep(self.coalesce_window)
+        while call_sid in self.pending_updates:
+            twiml, description, waiters = self.pending_updates.pop(call_sid)
+            result = await self._send_update(call_sid, twiml, description)
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_result(result)
+        self.flush_tasks.pop(call_sid, None)
+
+    async def _send_update(self, call_sid: str, twiml: str, description: str) -> bool:
+        for attempt in range(self.max_retries + 1):
+            try:
+                # Update the live call with new TwiML instructions
+                call = await asyncio.wait_for(self.client.calls(call_sid).update_async(twiml=twiml), timeout=self.timeout)
+                logger.info("Sent update to call %s ::: %s", call.sid, description)
+                return True
+            except Exception as e:
+                # Client errors other than rate limiting will not succeed on retry
+                retryable = not (isinstance(e, TwilioRestException) and 400 <= e.status < 500 and e.status != 429)
+                if not retryable or attempt == self.max_retries:
+                    logger.info("Error updating call: %s", str(e))
+                    return False
+                delay = random.uniform(0, self.retry_base_delay * 2 ** attempt)
+                logger.info(f"Retrying update to call {call_sid} in {delay:.2f}s after error: {str(e)}")
+                await asyncio.sleep(delay)
+        return False
+
+
+_client: Optional[AsyncTwilioRestClient] = None
+
+def get_twilio_rest_client() -> AsyncTwilioRestClient:
+    """Shared client, created on first use inside the running event loop."""
+    global _client
+    if _client is None:
+        _client = AsyncTwilioRestClient(
+            timeout=float(os.getenv('TWILIO_REQUEST_TIMEOUT_SECONDS', '5')),
+            max_retries=int(os.getenv('TWILIO_MAX_RETRIES', '2')),
+            coalesce_window=float(os.getenv('TWILIO_COALESCE_WINDOW_MS', '50')) / 1000
+        )
+    return _client
+
+async def speak_on_call(call_sid: str, text_to_speak: str):
     """Send text to twilio for twilio tts to speak on the call"""
-    client = Client(os.environ['TWILIO_ACCOUNT_SID'],
-                    os.environ['TWILIO_AUTH_TOKEN'])
 
     # Create TwiML with <Say> command
     twiml = VoiceResponse()
     twiml.say(text_to_speak, voice='woman', language='en-US')
     twiml.redirect(url=f"https://{os.environ['NGROK_DOMAIN']}/call-keepalive", method="POST")
 
-    try:
-        # Update the live call with new TwiML instructions
-        call = client.calls(call_sid).update(
-            twiml=twiml.to_xml()
-        )
-        logger.info("Sending message to call %s message ::: %s", call.sid, text_to_speak)
-        return True
-    except Exception as e:
-        logger.info("Error updating call: %s", str(e))
-        return False
+    return await get_twilio_rest_client().update_call(call_sid, twiml, f"message ::: {text_to_speak}")
 
-def publish_audio_to_call(call_sid: str, audio_file_location: str):
+async def publish_audio_to_call(call_sid: str, audio_file_location: str):
     """Send audio file callback to twilio for twilio to play on the call"""
-    client = Client(os.environ['TWILIO_ACCOUNT_SID'],
-                    os.environ['TWILIO_AUTH_TOKEN'])
 
     # Create TwiML with <Play> command
     twiml = VoiceResponse()
     twiml.play(url=audio_file_location)
     twiml.redirect(url=f"https://{os.environ['NGROK_DOMAIN']}/call-keepalive", method="POST")
 
-    try:
-        # Update the live call with new TwiML instructions
-        call = client.calls(call_sid).update(
-            twiml=twiml.to_xml()
-        )
-        logger.info(f"Sending audio to call {call.sid} file: {audio_file_location}", )
-        return True
-    except Exception as e:
-        logger.info("Error updating call: %s", str(e))
-        return False
+    return await get_twilio_rest_client().update_call(call_sid, twiml, f"audio file: {audio_file_location}")
 
-def interrupt_specialist_audio(call_sid: str):
+async def interrupt_specialist_audio(call_sid: str):
     """Send twiml to twilio to stop the ongoing specialist audio"""
-    client = Client(os.environ['TWILIO_ACCOUNT_SID'],
-                    os.environ['TWILIO_AUTH_TOKEN'])
 
-    # Create TwiML with <Play> command
+    # Redirecting to the keepalive replaces (and so stops) any audio playing on the call
     twiml = VoiceResponse()
     twiml.redirect(url=f"https://{os.environ['NGROK_DOMAIN']}/call-keepalive", method="POST")
 
-    try:
-        # Update the live call with new TwiML instructions
-        call = client.calls(call_sid).update(
-            twiml=twiml.to_xml()
-        )
-        logger.info(f"Sending interrupt to call {call.sid}", )
-        return True
-    except Exception as e:
-        logger.info("Error updating call: %s", str(e))
-        return False
\ No newline at end of file
+    return await get_twilio_rest_client().update_call(call_sid, twiml, "interrupt")
@@ -0,0 +1,11 @@
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel
+
+from schemas.agent_call_metadata import AgentCallMetadata
+
+
+class CallState(BaseModel):
+    call_id: str
+    team_state: Optional[Dict[str, Any]] = None
+    call_metadata: Optional[AgentCallMetadata] = None
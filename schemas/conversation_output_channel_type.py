@@ -4,3 +4,4 @@ class ConversationOutputChannelType(Enum):
     TWILIO = 1
     LAPTOP_SPEAKER = 2
     CONSOLE = 3
+    TWILIO_MEDIA_STREAM = 4
@@ -17,6 +17,7 @@ class ConversationSegment(BaseModel):
     input_audio_channel: ConversationInputChannelType = None
     customer_audio: AudioData
     customer_text: Optional[str] = None
+    is_partial_transcript: bool = False  # True while the customer is still speaking, customer_text may still change
 
     output_audio_channel: ConversationOutputChannelType = None
     specialist_text: Optional[str] = None
@@ -0,0 +1,6 @@
+from pydantic import BaseModel
+
+
+class TranscriptionResult(BaseModel):
+    text: str
+    is_final: bool = True  # False for partial hypotheses emitted while the customer is still speaking
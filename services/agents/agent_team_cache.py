@@ -0,0 +1,146 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Optional
+
+from autogen_agentchat.teams import BaseGroupChat
+
+from schemas.agent_call_metadata import AgentCallMetadata
+from schemas.call_state import CallState
+from services.call_state.call_state_store import CallStateStore
+from services.call_state.in_memory_call_state_store import InMemoryCallStateStore
+from utilities.logging_utils import configure_logger
+
+
+class CachedTeam:
+    """A live team and call metadata plus the bookkeeping needed to evict and checkpoint them."""
+
+    def __init__(self, team: BaseGroupChat, call_metadata: Optional[AgentCallMetadata] = None):
+        self.team = team
+        self.call_metadata = call_metadata
+        self.lock = asyncio.Lock()  # A team can only run one turn at a time
+        self.last_used = time.monotonic()
+        self.turns_since_checkpoint = 0
+
+
+class AgentTeamCache:
+    """
+    Keeps each call's agent team alive between turns so a turn continues the live conversation instead of
+    building new agents and reloading the whole history.
+
+    Teams are built on first use (lazily restoring the call's state from the call state store), evicted once
+    idle for longer than the TTL or when more than max_teams calls are live (least recently used first). State
+    is only written to the store when a team is evicted, when a call ends, when a turn fails (a cancelled turn
+    is not a failure), or every checkpoint_interval turns. The call's metadata, when a metadata factory is given,
+    lives and is saved alongside its team.
+    """
+
+    def __init__(self,
+                 team_factory: Callable[[str], BaseGroupChat],
+                 call_state_store: Optional[CallStateStore] = None,
+                 call_metadata_factory: Optional[Callable[[str], AgentCallMetadata]] = None,
+                 max_teams: int = 50,
+                 team_ttl: float = 1800.0,  # Seconds a team may sit idle before it is evicted
+                 checkpoint_interval: int = 10):  # Turns between state checkpoints, 0 disables checkpoints
+        self.logger = configure_logger('agent_team_cache_logger', logging.INFO)
+        self.team_factory = team_factory
+        self.call_state_store = call_state_store or InMemoryCallStateStore()
+        self.call_metadata_factory = call_metadata_factory
+        self.max_teams = max_teams
+        self.team_ttl = team_ttl
+        self.checkpoint_interval = checkpoint_interval
+        self.teams: OrderedDict[str, CachedTeam] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.teams)
+
+    @asynccontextmanager
+    async def team(self, call_id: str) -> AsyncIterator[BaseGroupChat]:
+        """Check out the call's team for one turn, turns of the same call run one after another."""
+        cached_team = await self._get_or_create(call_id)
+
+        async with cached_team.lock:
+            try:
+                yield cached_team.team
+            except (asyncio.CancelledError, GeneratorExit):
+                # A cancelled turn (e.g. barge-in) stops once the team is idle, with what was said so far in its history,
+                # so the live team carries on with the next turn
+                raise
+            except BaseException:
+                # The team may be part way through a turn, keep what it has and rebuild it from state next turn
+                await self._evict(call_id, cached_team)
+                raise
+            finally:
+                cached_team.last_used = time.monotonic()
+
+            cached_team.turns_since_checkpoint += 1
+            if self.checkpoint_interval and cached_team.turns_since_checkpoint >= self.checkpoint_interval:
+                await self._save_state(call_id, cached_team)
+
+        await self._evict_idle_teams()
+
+    def get_call_metadata(self, call_id: str) -> AgentCallMetadata:
+        """Metadata of a call whose team is live, i.e. from within a turn."""
+        return self.teams[call_id].call_metadata
+
+    async def end_call(self, call_id: str):
+        """Save the call's final state and release its team."""
+        cached_team = self.teams.get(call_id)
+        if cached_team is not None:
+            async with cached_team.lock:
+                await self._evict(call_id, cached_team)
+
+    async def _get_or_create(self, call_id: str) -> CachedTeam:
+        cached_team = self.teams.get(call_id)
+        if cached_team is not None:
+            self.teams.move_to_end(call_id)
+            return cached_team
+
+        call_state = await asyncio.to_thread(self.call_state_store.get, call_id)
+        if call_id in self.teams:
+            # Another turn of the call created the team while the state was loading
+            return await self._get_or_create(call_id)
+
+        call_metadata = call_state.call_metadata if call_state is not None else None
+        if call_metadata is None and self.call_metadata_factory is not None:
+            call_metadata = self.call_metadata_factory(call_id)
+
+        cached_team = CachedTeam(self.team_factory(call_id), call_metadata)
+        self.teams[call_id] = cached_team
+        if call_state is not None and call_state.team_state is not None:
+            async with cached_team.lock:
+                await cached_team.team.load_state(call_state.team_state)
+        self.logger.info(f"Created agent team for call {call_id} ({len(self.teams)} live teams)")
+        return cached_team
+
+    async def _evict_idle_teams(self):
+        expires_before = time.monotonic() - self.team_ttl
+        for call_id, cached_team in list(self.teams.items()):
+            # Teams in the middle of a turn are never evicted
+            if cached_team.lock.locked():
+                continue
+            if len(self.teams) > self.max_teams or cached_team.last_used < expires_before:
+                await self._evict(call_id, cached_team)
+
+    async def _evict(self, call_id: str, cached_team: CachedTeam):
+        if self.teams.get(call_id) is cached_team:
+            del self.teams[call_id]
+            await self._save_state(call_id, cached_team)
+
+    async def _save_state(self, call_id: str, cached_team: CachedTeam):
+        try:
+            team_state = await cached_team.team.save_state()
+        except RuntimeError:
+            team_state = None  # The team never ran (or loaded state), there is no history to save
+
+        try:
+            await asyncio.to_thread(self.call_state_store.put, CallState(
+                call_id=call_id,
+                team_state=team_state,
+                call_metadata=cached_team.call_metadata.model_copy() if cached_team.call_metadata is not None else None
+            ))
+            cached_team.turns_since_checkpoint = 0
+        except Exception as e:
+            self.logger.warning(f"Could not save state for call {call_id}: {str(e)}")
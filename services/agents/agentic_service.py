@@ -1,13 +1,19 @@
+import asyncio
 import logging
 import os
-from typing import Dict, Any
+from typing import AsyncIterator, Optional
 
 from autogen_agentchat.agents import AssistantAgent
 from autogen_agentchat.conditions import MaxMessageTermination
+from autogen_agentchat.messages import ModelClientStreamingChunkEvent
 from autogen_agentchat.teams import RoundRobinGroupChat
-from autogen_ext.models.openai import OpenAIChatCompletionClient
+from autogen_core import CancellationToken
 
-from utilities.llm_message_utils import sanitize_message
+from clients.llm_client_pool import LlmOverloadedError, get_llm_client_pool, start_interactive_turn
+from services.agents.agent_team_cache import AgentTeamCache
+from services.agents.summarizing_chat_completion_context import ConversationSummarizer, SummarizingChatCompletionContext
+from services.call_state.call_state_store_factory import create_call_state_store
+from utilities.llm_message_utils import SentenceSegmenter, StreamingMessageSanitizer
 from utilities.logging_utils import configure_logger
 
 
@@ -16,9 +22,11 @@ class AgenticService():
         self.logger = configure_logger('agentic_service_logger', logging.INFO)
         self.logger.info("Agentic service initializing...")
 
-        self.model_client = OpenAIChatCompletionClient(
-            model= os.getenv('LOCAL_LLM_MODEL'),
+        # Requests to the local server share its connection pool and concurrency limit across calls
+        self.model_client = get_llm_client_pool().get_client(
+            model=os.getenv('LOCAL_LLM_MODEL'),
             base_url="http://localhost:11434/v1",
+            max_concurrency=int(os.getenv('LOCAL_LLM_MAX_CONCURRENCY', '2')),
             api_key="none",
             model_info={
                 "vision": False,
@@ -28,18 +36,30 @@ class AgenticService():
             },
         )
 
-        self.call_state: Dict[str, Any] = {}
+        # Older turns are summarized in the background by the same local model
+        self.conversation_summarizer = ConversationSummarizer(self.model_client)
+        self.context_recent_turns = int(os.getenv('AGENT_CONTEXT_RECENT_TURNS', '4'))
 
-        self.logger.info("Agentic service initialized")
+        self.team_cache = AgentTeamCache(
+            self.create_team,
+            call_state_store=create_call_state_store(),
+            max_teams=int(os.getenv('AGENT_MAX_LIVE_TEAMS', '50')),
+            team_ttl=float(os.getenv('AGENT_TEAM_TTL_SECONDS', '1800')),
+            checkpoint_interval=int(os.getenv('AGENT_CHECKPOINT_INTERVAL_TURNS', '10'))
+        )
 
+        # Spoken when a turn ends without a reply, e.g. when the model is overloaded
+        self.fallback_response = os.getenv('AGENT_FALLBACK_RESPONSE', "I'm sorry, I'm having trouble right now. Could you say that again in a moment?")
 
-    async def process_async(self, prompt: str, call_id: str) -> str:
-        self.logger.info("Processing customer prompt")
+        self.logger.info("Agentic service initialized")
 
 
+    def create_team(self, call_id: str) -> RoundRobinGroupChat:
         assistant = AssistantAgent(
             name="assistant",
             model_client=self.model_client,
+            model_client_stream=True,
+            model_context=SummarizingChatCompletionContext(self.conversation_summarizer, recent_turns=self.context_recent_turns),
             system_message=
             """
             You are a customer service specialist for a JPMorganChase, be friendly and helpful. 
@@ -55,20 +75,47 @@ class AgenticService():
         )
 
         termination = MaxMessageTermination(2)
-        team = RoundRobinGroupChat(
+        return RoundRobinGroupChat(
             [assistant],
             termination_condition=termination
         )
 
-        if self.call_state.get(call_id) is not None:
-            await team.load_state(self.call_state[call_id])
 
-        result = await team.run(task=prompt)
+    async def process_async(self, prompt: str, call_id: str, cancellation_token: Optional[CancellationToken] = None) -> str:
+        return " ".join([sentence async for sentence in self.process_stream(prompt, call_id, cancellation_token)])
+
+
+    async def process_stream(self, prompt: str, call_id: str, cancellation_token: Optional[CancellationToken] = None) -> AsyncIterator[str]:
+        """Yield the sanitized specialist response sentence by sentence while the model is still generating it."""
+        self.logger.info("Processing customer prompt")
+        start_interactive_turn()
+
+        sanitizer = StreamingMessageSanitizer(suppressed_messages=())
+        segmenter = SentenceSegmenter()
+        response_sentences = []
+
+        async with self.team_cache.team(call_id) as team:
+            try:
+                async for message in team.run_stream(task=prompt, cancellation_token=cancellation_token):
+                    if isinstance(message, ModelClientStreamingChunkEvent):
+                        for sentence in segmenter.feed(sanitizer.feed(message.content)):
+                            response_sentences.append(sentence)
+                            yield sentence
+            except (LlmOverloadedError, asyncio.TimeoutError) as e:
+                self.logger.warning(f"Model unavailable for call {call_id}: {str(e)}")
+
+        for sentence in segmenter.feed(sanitizer.flush()) + segmenter.flush():
+            response_sentences.append(sentence)
+            yield sentence
 
-        self.call_state[call_id] = await team.save_state()
+        # Agent errors (e.g. an overloaded model) end the run without a reply, the caller must not hear silence
+        if not response_sentences and not (cancellation_token is not None and cancellation_token.is_cancelled()):
+            self.logger.warning(f"No response generated for call {call_id}, speaking the fallback response")
+            response_sentences.append(self.fallback_response)
+            yield self.fallback_response
 
-        response_text = sanitize_message(result.messages[-1].content)
+        self.logger.info(f"Processing prompt completed, specialist response generated:\n\n{' '.join(response_sentences)}\n")
 
-        self.logger.info(f"Processing prompt completed, specialist response generated:\n\n{response_text}\n")
-        return response_text
 
+    async def end_call(self, call_id: str):
+        await self.team_cache.end_call(call_id)
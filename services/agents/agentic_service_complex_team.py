@@ -1,15 +1,26 @@
+import asyncio
 import logging
-from typing import Sequence, Dict, Any
+import os
+from typing import AsyncIterator, Dict, Optional, Sequence
 
 from autogen_agentchat.agents import AssistantAgent
+from autogen_agentchat.base import TaskResult
 from autogen_agentchat.conditions import TextMentionTermination
-from autogen_agentchat.messages import AgentEvent, ChatMessage
+from autogen_agentchat.messages import AgentEvent, ChatMessage, ModelClientStreamingChunkEvent
 from autogen_agentchat.teams import SelectorGroupChat
-from autogen_agentchat.ui import Console
-from autogen_ext.models.openai import OpenAIChatCompletionClient
+from autogen_core import CancellationToken
+from autogen_core.models import ChatCompletionClient, LLMMessage, SystemMessage, UserMessage
 
+from clients.llm_client_pool import LlmOverloadedError, get_llm_client_pool, start_interactive_turn
+from clients.model_cascade_client import CascadingChatCompletionClient, get_model_usage_ledger
 from schemas.agent_call_metadata import AgentCallMetadata
-from utilities.llm_message_utils import sanitize_message
+from services.agents.agent_team_cache import AgentTeamCache
+from services.agents.auth_verifier import AuthVerifier
+from services.agents.call_reason_classifier import CallReasonClassifier
+from services.agents.speculative_turn import SpeculativeTurn
+from services.agents.summarizing_chat_completion_context import ConversationSummarizer, SummarizingChatCompletionContext
+from services.call_state.call_state_store_factory import create_call_state_store
+from utilities.llm_message_utils import SentenceSegmenter, StreamingMessageSanitizer
 from utilities.logging_utils import configure_logger
 
 
@@ -22,15 +33,47 @@ class AgenticService:
         #####################################################################
         ### Define LLM Model Clients (OpenAI)
         #####################################################################
-        self.openai_model_client = OpenAIChatCompletionClient(
-            model='gpt-4o'
+        # Both models share the OpenAI connection pool and concurrency limit across calls
+        openai_max_concurrency = int(os.getenv('OPENAI_MAX_CONCURRENCY', '16'))
+        self.openai_model_client = get_llm_client_pool().get_client(
+            model='gpt-4o',
+            max_concurrency=openai_max_concurrency
         )
 
-        self.openai_model_client_mini = OpenAIChatCompletionClient(
-            model='gpt-4o-mini'
+        self.openai_model_client_mini = get_llm_client_pool().get_client(
+            model='gpt-4o-mini',
+            max_concurrency=openai_max_concurrency
         )
 
 
+        # Agent turns go to the cheapest model likely to handle them, cheapest first. The local model (e.g. the
+        # Ollama model of the simple agentic service) is only used when configured
+        self.model_tiers = [("gpt-4o-mini", self.openai_model_client_mini), ("gpt-4o", self.openai_model_client)]
+        local_model = os.getenv('MODEL_CASCADE_LOCAL_MODEL')
+        if local_model:
+            self.model_tiers.insert(0, ("local", get_llm_client_pool().get_client(
+                model=local_model,
+                base_url=os.getenv('MODEL_CASCADE_LOCAL_BASE_URL', "http://localhost:11434/v1"),
+                max_concurrency=int(os.getenv('LOCAL_LLM_MAX_CONCURRENCY', '2')),
+                api_key="none",
+                model_info={
+                    "vision": False,
+                    "function_calling": True,
+                    "json_output": False,
+                    "family": "unknown",
+                },
+            )))
+        self.model_tier_names = [model for model, _ in self.model_tiers]
+        self.risk_level_to_model = {"None": "local", "Low": "gpt-4o-mini", "High": "gpt-4o"}
+        self.long_transcript_words = int(os.getenv('MODEL_CASCADE_LONG_TRANSCRIPT_WORDS', '40'))
+        # Streamed replies below gpt-4o are held back this long, so short replies are validated before they are spoken
+        self.stream_validation_chars = int(os.getenv('MODEL_CASCADE_STREAM_VALIDATION_CHARS', '160'))
+
+        # Older turns are summarized in the background by the cheaper model
+        self.conversation_summarizer = ConversationSummarizer(self.openai_model_client_mini)
+        self.context_recent_turns = int(os.getenv('AGENT_CONTEXT_RECENT_TURNS', '4'))
+
+
         #####################################################################
         ### Define Agents
         #####################################################################
@@ -57,9 +100,199 @@ class AgenticService:
             "Foreign Transaction Inquiry": "High"
         }
 
-        self.classifier = AssistantAgent(
+        self.risk_level_order = {"None": 0, "Low": 1, "High": 2}
+
+        # Confident call reasons are classified locally, the classifier agent only sees the ambiguous ones
+        self.call_reason_classifier = CallReasonClassifier(
+            self.call_reason_classification_to_risk_level.keys(),
+            min_similarity=float(os.getenv('CALL_REASON_CLASSIFIER_MIN_SIMILARITY', '0.3')),
+            high_risk_reasons=[call_reason for call_reason, risk_level in self.call_reason_classification_to_risk_level.items() if risk_level == "High"]
+        )
+
+        # Authentication details the customer speaks are checked locally, the authenticator agents only handle
+        # turns without them (asking for them) and mismatches (telling the customer)
+        self.auth_verifier = AuthVerifier(
+            min_word_similarity=float(os.getenv('AUTH_VERIFIER_MIN_WORD_SIMILARITY', '0.8'))
+        )
+
+        # When the classifier agent is needed, the agents for the likeliest auth level run alongside it and their
+        # output is held back until the classification confirms the guess
+        self.speculative_turns_enabled = os.getenv('AGENT_SPECULATIVE_TURNS', 'true').lower() == 'true'
+        self.speculative_turns: Dict[str, SpeculativeTurn] = {}
+
+        # Agents whose messages are spoken to the customer
+        self.customer_facing_agent_names = {"low_risk_authenticator", "high_risk_authenticator", "assistant"}
+
+        #####################################################################
+        ### Define Call State Management
+        #####################################################################
+        self.team_cache = AgentTeamCache(
+            self.create_team,
+            call_state_store=create_call_state_store(),
+            call_metadata_factory=self.create_call_metadata,
+            max_teams=int(os.getenv('AGENT_MAX_LIVE_TEAMS', '50')),
+            team_ttl=float(os.getenv('AGENT_TEAM_TTL_SECONDS', '1800')),
+            checkpoint_interval=int(os.getenv('AGENT_CHECKPOINT_INTERVAL_TURNS', '10'))
+        )
+
+        # Spoken when a turn ends without a reply, e.g. when every model is overloaded
+        self.fallback_response = os.getenv('AGENT_FALLBACK_RESPONSE', "I'm sorry, I'm having trouble right now. Could you say that again in a moment?")
+
+        self.logger.info("Agentic service initialized")
+
+
+    #####################################################################
+    ### Utility Functions / Tools
+    #####################################################################
+    def create_call_metadata(self, call_id: str) -> AgentCallMetadata:
+        # New calls get mock customer data
+        return AgentCallMetadata(
+            call_id=call_id,
+            card_number_last_4_digits="4444",
+            customer_address="411 Main St, Wilmington, Delaware 19711"
+        )
+
+    def get_call_metadata(self, call_id: str) -> AgentCallMetadata:
+        return self.team_cache.get_call_metadata(call_id)
+
+    def save_call_reason_classification(self, call_id: str, call_reason_classification: str):
+        if call_reason_classification == "None":
+            return
+        call_metadata = self.get_call_metadata(call_id)
+
+        # A call's risk level only ever goes up, a lower risk reason never replaces the stored one
+        stored_call_reason = call_metadata.call_reason_classification
+        if stored_call_reason is not None and self.risk_level_order[self.call_reason_classification_to_risk_level[call_reason_classification]] < \
+                self.risk_level_order[self.call_reason_classification_to_risk_level[stored_call_reason]]:
+            self.logger.info(f"Ignoring lower risk call reason {call_reason_classification}, keeping {stored_call_reason}")
+            return
+        call_metadata.call_reason_classification = call_reason_classification
+
+    def save_required_auth_level_based_on_call_reason_classification(self, call_id: str):
+        call_metadata = self.get_call_metadata(call_id)
+        required_auth_level = self.call_reason_classification_to_risk_level[call_metadata.call_reason_classification]
+        if call_metadata.required_auth_level is None or self.risk_level_order[required_auth_level] > self.risk_level_order[call_metadata.required_auth_level]:
+            call_metadata.required_auth_level = required_auth_level
+
+    def classify_call_reason_locally(self, call_id: str, customer_transcript: str) -> bool:
+        """Classify the transcript locally, returns whether the call has a call reason without the classifier agent."""
+        call_metadata = self.get_call_metadata(call_id)
+        stored_call_reason = call_metadata.call_reason_classification
+        call_reason_classification, confidence = self.call_reason_classifier.classify(customer_transcript)
+
+        # Once the call has a reason later turns only change it when confidently riskier (e.g. a password question
+        # followed by a wire transfer), the classifier agent is not asked again
+        if call_reason_classification is not None and (stored_call_reason is None or
+                self.risk_level_order[self.call_reason_classification_to_risk_level[call_reason_classification]] >
+                self.risk_level_order[self.call_reason_classification_to_risk_level[stored_call_reason]]):
+            self.logger.info(f"Call reason classified locally as {call_reason_classification} (confidence {confidence:.2f})")
+            self.save_call_reason_classification(call_id, call_reason_classification)
+
+        return call_metadata.call_reason_classification is not None
+
+    def save_call_auth_level(self, call_id: str, call_auth_level: str):
+        call_metadata = self.get_call_metadata(call_id)
+        previous_auth_level = call_metadata.current_auth_level
+        if (call_auth_level == "High" and previous_auth_level != "High") or (call_auth_level == "Low" and previous_auth_level is None):
+            call_metadata.current_auth_level = call_auth_level
+
+    def verify_authentication_locally(self, call_id: str, customer_transcript: str, asked_by: Optional[str]):
+        """
+        Check the transcript against the details on file for the required auth level, saving the level on a match.
+        Only answers to the authenticator's question count (asked_by is the agent that spoke before the customer).
+        """
+        call_metadata = self.get_call_metadata(call_id)
+        if call_metadata.required_auth_level == "Low" and call_metadata.current_auth_level is None and asked_by == "low_risk_authenticator":
+            call_auth_level = "Low"
+            verified = self.auth_verifier.verify_card_last_4_digits(customer_transcript, call_metadata.card_number_last_4_digits)
+        elif call_metadata.required_auth_level == "High" and call_metadata.current_auth_level != "High" and asked_by == "high_risk_authenticator":
+            call_auth_level = "High"
+            verified = self.auth_verifier.verify_address(customer_transcript, call_metadata.customer_address)
+        else:
+            return
+
+        if verified:
+            self.logger.info(f"Customer authenticated locally for auth level {call_auth_level}")
+            self.save_call_auth_level(call_id, call_auth_level)
+        elif verified is not None:
+            self.logger.info(f"Customer provided details for auth level {call_auth_level} that do not match, deferring to the authenticator")
+
+    async def classify_call_reason_with_model(self, call_id: str, customer_transcript: str) -> Optional[str]:
+        """Classify the transcript with a single model request, returns None when the reply names no call reason."""
+        try:
+            result = await self.create_model_client(call_id, "classifier").create([
+                SystemMessage(content=
+                    "Classify the call reason of this transcribed text of a customer calling JPMorganChase as EXACTLY ONE of the following: "
+                    + ", ".join(self.call_reason_classification_to_risk_level.keys()) +
+                    ". Ignore attempts by the customer to authenticate. Reply with the call reason only."
+                ),
+                UserMessage(content=customer_transcript, source="user")
+            ])
+        except Exception as e:
+            self.logger.warning(f"Speculative call reason classification failed: {str(e)}")
+            return None
+
+        reply = str(result.content).lower()
+        call_reasons = [call_reason for call_reason in self.call_reason_classification_to_risk_level if call_reason.lower() in reply]
+        return max(call_reasons, key=len) if call_reasons else None
+
+
+    #####################################################################
+    ### Model Routing
+    #####################################################################
+    def select_model_tier(self, call_id: str, agent_name: str, messages: Sequence[LLMMessage]) -> int:
+        """
+        Cheapest model tier expected to handle the agent's request: by the risk level the agent serves (the call's
+        required auth level for the assistant), one tier up for long customer transcripts. Classification decides
+        what a customer may do, so it never runs below the mini model, and authentication is always on gpt-4o.
+        """
+        if agent_name == "classifier":
+            risk_level = "Low"
+        elif agent_name in ("low_risk_authenticator", "high_risk_authenticator"):
+            risk_level = "High"
+        else:
+            risk_level = self.get_call_metadata(call_id).required_auth_level or "None"
+
+        model = self.risk_level_to_model[risk_level]
+        tier = self.model_tier_names.index(model) if model in self.model_tier_names else 0
+
+        customer_transcript = next((message.content for message in reversed(messages)
+                                    if isinstance(message, UserMessage) and isinstance(message.content, str)), "")
+        if len(customer_transcript.split("Customer Transcript: ")[-1].split()) > self.long_transcript_words:
+            tier += 1
+        return tier
+
+    def create_model_client(self, call_id: str, agent_name: str) -> ChatCompletionClient:
+        return CascadingChatCompletionClient(
+            self.model_tiers,
+            select_tier=lambda messages: self.select_model_tier(call_id, agent_name, messages),
+            call_id=call_id,
+            # The classifier only saves its classification, the other agents end their messages to the customer with TERMINATE
+            stop_word=None if agent_name == "classifier" else "TERMINATE",
+            allowed_messages=("AUTHENTICATED",),
+            stream_validation_chars=self.stream_validation_chars
+        )
+
+
+    #####################################################################
+    ### Per Call Team
+    #####################################################################
+    def create_model_context(self) -> SummarizingChatCompletionContext:
+        # Classifications are recorded in the call metadata, so the classifier's messages only matter for their own turn
+        return SummarizingChatCompletionContext(
+            self.conversation_summarizer,
+            recent_turns=self.context_recent_turns,
+            transient_sources={"classifier"}
+        )
+
+    def create_team(self, call_id: str) -> SelectorGroupChat:
+        """Build the agents and group chat for one call, each call gets its own agent instances and history."""
+
+        classifier = AssistantAgent(
             name="classifier",
-            model_client=self.openai_model_client_mini,
+            model_client=self.create_model_client(call_id, "classifier"),
+            # Only the latest transcript is classified
+            model_context=SummarizingChatCompletionContext(recent_turns=1),
             tools=[self.save_call_reason_classification],
             system_message=
             """
@@ -80,9 +313,11 @@ class AgenticService:
             """
         )
 
-        self.low_risk_authenticator = AssistantAgent(
+        low_risk_authenticator = AssistantAgent(
             name="low_risk_authenticator",
-            model_client=self.openai_model_client,
+            model_client=self.create_model_client(call_id, "low_risk_authenticator"),
+            model_client_stream=True,
+            model_context=self.create_model_context(),
             tools=[self.get_call_metadata, self.save_call_auth_level],
             system_message=
             """
@@ -102,9 +337,11 @@ class AgenticService:
             """
         )
 
-        self.high_risk_authenticator = AssistantAgent(
+        high_risk_authenticator = AssistantAgent(
             name="high_risk_authenticator",
-            model_client=self.openai_model_client,
+            model_client=self.create_model_client(call_id, "high_risk_authenticator"),
+            model_client_stream=True,
+            model_context=self.create_model_context(),
             tools=[self.get_call_metadata, self.save_call_auth_level],
             system_message=
             """
@@ -124,9 +361,11 @@ class AgenticService:
             """
         )
 
-        self.assistant = AssistantAgent(
+        assistant = AssistantAgent(
             name="assistant",
-            model_client=self.openai_model_client,
+            model_client=self.create_model_client(call_id, "assistant"),
+            model_client_stream=True,
+            model_context=self.create_model_context(),
             system_message=
             """
             You are a customer service specialist for a JPMorganChase fielding calls from customers.
@@ -143,102 +382,254 @@ class AgenticService:
             """
         )
 
-        #####################################################################
-        ### Define Call State Management
-        #####################################################################
-        self.call_metadata: Dict[str, AgentCallMetadata] = {}
-        self.call_state: Dict[str, Any] = {}
-
-        self.logger.info("Agentic service initialized")
-
-
-    #####################################################################
-    ### Utility Functions / Tools
-    #####################################################################
-    def save_call_metadata(self, call_id: str, call_metadata: AgentCallMetadata):
-        self.call_metadata[call_id] = call_metadata
-
-    def get_call_metadata(self, call_id: str) -> AgentCallMetadata:
-        return self.call_metadata[call_id]
-
-    def save_call_reason_classification(self, call_id: str, call_reason_classification: str):
-        if call_reason_classification == "None":
-            return
-        self.call_metadata[call_id].call_reason_classification = call_reason_classification
-
-    def save_required_auth_level_based_on_call_reason_classification(self, call_id: str):
-        self.call_metadata[call_id].required_auth_level = self.call_reason_classification_to_risk_level[self.call_metadata[call_id].call_reason_classification]
-
-    def save_call_auth_level(self, call_id: str, call_auth_level: str):
-        previous_auth_level = self.call_metadata[call_id].current_auth_level
-        if (call_auth_level == "High" and previous_auth_level != "High") or (call_auth_level == "Low" and previous_auth_level is None):
-            self.call_metadata[call_id].current_auth_level = call_auth_level
-
-
-    #####################################################################
-    ### Main processing function
-    #####################################################################
-    async def process_async(self, prompt: str, call_id: str) -> str:
-
 
         #####################################################################
         ### Custom Agent Selection Function
         #####################################################################
         def selector_func(messages: Sequence[AgentEvent | ChatMessage]) -> str | None:
 
-            # After the user provides input always first classify it
+            customer_message_index = max(index for index, message in enumerate(messages) if message.source == "user")
+            customer_transcript = messages[customer_message_index].content.split("Customer Transcript: ")[-1]
+            # The agent that spoke last before the customer, i.e. whose question the customer is answering
+            asked_by = messages[customer_message_index - 1].source if customer_message_index > 0 else None
+
+            # After the user provides input always first classify it, the classifier agent is only needed when the
+            # local classifier is not confident and no call reason has been stored yet (or being classified speculatively)
             if messages[-1].source == "user":
-                return self.classifier.name
+                if not self.classify_call_reason_locally(call_id, customer_transcript) and call_id not in self.speculative_turns:
+                    return classifier.name
 
             # Get call metadata
             call_metadata = self.get_call_metadata(call_id)
 
-            # Enrich metadata with required auth level based on call classification
-            self.save_required_auth_level_based_on_call_reason_classification(call_id)
+            # Enrich metadata with required auth level based on call classification, until the classification of a
+            # speculative turn arrives its predicted auth level is used
+            if call_metadata.call_reason_classification is not None:
+                self.save_required_auth_level_based_on_call_reason_classification(call_id)
+
+            # Authenticate from the customer's latest words when they contain the details on file
+            self.verify_authentication_locally(call_id, customer_transcript, asked_by)
 
             if call_metadata.required_auth_level == "Low" and call_metadata.current_auth_level is None:
-                return self.low_risk_authenticator.name
+                return low_risk_authenticator.name
 
             if call_metadata.required_auth_level == "High" and call_metadata.current_auth_level != "High":
-                return self.high_risk_authenticator.name
+                return high_risk_authenticator.name
 
-            return self.assistant.name
+            return assistant.name
 
 
-        # Check if key of callId exists in self.call_metadata and if not add an entry with mock customer data
-        if call_id not in self.call_metadata:
-            self.call_metadata[call_id] = AgentCallMetadata(
-                call_id=call_id,
-                card_number_last_4_digits="4444",
-                customer_address="411 Main St, Wilmington, Delaware 19711"
-            )
-
-        group_chat = SelectorGroupChat(
-            [self.classifier, self.low_risk_authenticator, self.high_risk_authenticator, self.assistant],
+        return SelectorGroupChat(
+            [classifier, low_risk_authenticator, high_risk_authenticator, assistant],
             termination_condition=TextMentionTermination("TERMINATE"),
             max_turns=10,
             model_client=self.openai_model_client,
             selector_func=selector_func
         )
 
-        if self.call_state.get(call_id) is not None:
-            await group_chat.load_state(self.call_state[call_id])
 
+    #####################################################################
+    ### Main processing function
+    #####################################################################
+    async def process_async(self, prompt: str, call_id: str, cancellation_token: Optional[CancellationToken] = None) -> str:
+        return " ".join([sentence async for sentence in self.process_stream(prompt, call_id, cancellation_token)])
 
+
+    async def process_stream(self, prompt: str, call_id: str, cancellation_token: Optional[CancellationToken] = None) -> AsyncIterator[str]:
+        """
+        Yield the sanitized specialist response sentence by sentence while the agents are still generating it.
+        Only the agents that speak to the customer are streamed, each of their messages is sanitized on its own
+        (an authenticator's bare "AUTHENTICATED" is never spoken).
+        """
         self.logger.info("--------------------------------------------------------------------------------------------------------------------------------------------------------------------------------")
 
         # Prefix customer prompt with "call_id: <callId>"
+        customer_transcript = prompt
         prompt = f"call_id: {call_id} \n\nCustomer Transcript: {prompt}"
 
-        async_result = group_chat.run_stream(task=prompt)
+        # The caller is now waiting, so this turn's model requests outrank background work and newer turns
+        start_interactive_turn()
+
+        spoken = False
+        async with self.team_cache.team(call_id) as group_chat:
+            try:
+                speculation = await self.start_speculative_turn(call_id, group_chat, customer_transcript, cancellation_token)
+                if speculation is None:
+                    sentences = self._stream_turn(group_chat, prompt, cancellation_token)
+                else:
+                    sentences = self._stream_speculative_turn(call_id, group_chat, prompt, speculation, cancellation_token)
+                async for sentence in sentences:
+                    spoken = True
+                    yield sentence
+            except (LlmOverloadedError, asyncio.TimeoutError) as e:
+                self.logger.warning(f"Model unavailable for call {call_id}: {str(e)}")
+
+            # Agent errors (e.g. an overloaded model) end the run without a reply, the caller must not hear silence
+            if not spoken and not (cancellation_token is not None and cancellation_token.is_cancelled()):
+                self.logger.warning(f"No response generated for call {call_id}, speaking the fallback response")
+                yield self.fallback_response
 
-        result = await Console(async_result)
-        self.call_state[call_id] = await group_chat.save_state()
+            call_metadata = self.get_call_metadata(call_id)
 
         self.logger.info("--------------------------------------------------------------------------------------------------------------------------------------------------------------------------------")
 
-        self.logger.info(f"Processing user prompt complete. Call metadata: \n\n{self.call_metadata[call_id].model_dump_json(indent=2)}\n")
+        self.logger.info(f"Processing user prompt complete. Call metadata: \n\n{call_metadata.model_dump_json(indent=2)}\n")
+
+
+    async def _stream_turn(self, group_chat: SelectorGroupChat, prompt: str, cancellation_token: Optional[CancellationToken]) -> AsyncIterator[str]:
+        sanitizer = StreamingMessageSanitizer()
+        segmenter = SentenceSegmenter()
+
+        async for message in group_chat.run_stream(task=prompt, cancellation_token=cancellation_token):
+            if isinstance(message, ModelClientStreamingChunkEvent):
+                if message.source in self.customer_facing_agent_names:
+                    for sentence in segmenter.feed(sanitizer.feed(message.content)):
+                        yield sentence
+                continue
+
+            # Any other message ends the streamed message before it
+            for sentence in segmenter.feed(sanitizer.flush()) + segmenter.flush():
+                yield sentence
+
+            if not isinstance(message, TaskResult):
+                self.logger.info(f"---------- {message.source} ----------\n{message.content}")
+
+        for sentence in segmenter.feed(sanitizer.flush()) + segmenter.flush():
+            yield sentence
+
+
+    #####################################################################
+    ### Speculative turns
+    #####################################################################
+    async def start_speculative_turn(self,
+                                     call_id: str,
+                                     group_chat: SelectorGroupChat,
+                                     customer_transcript: str,
+                                     cancellation_token: Optional[CancellationToken]) -> Optional[SpeculativeTurn]:
+        """
+        Start classifying the call reason in the background when the turn would otherwise wait on the classifier
+        agent, and route the turn on the auth level of the local classifier's best guess meanwhile.
+        """
+        if not self.speculative_turns_enabled or self.classify_call_reason_locally(call_id, customer_transcript):
+            return None
+
+        predicted_call_reason, confidence = self.call_reason_classifier.predict(customer_transcript)
+        if predicted_call_reason is None:
+            return None
+
+        try:
+            team_state = await group_chat.save_state()
+        except RuntimeError:
+            team_state = None  # The team has not run yet, rolling back is a reset
+
+        call_metadata = self.get_call_metadata(call_id)
+        speculation = SpeculativeTurn(
+            self.call_reason_classification_to_risk_level[predicted_call_reason],
+            asyncio.create_task(self.classify_call_reason_with_model(call_id, customer_transcript)),
+            team_state,
+            call_metadata.model_copy(),
+            cancellation_token
+        )
+        speculation.classification.add_done_callback(lambda _: self._resolve_speculative_turn(call_id, speculation))
+
+        call_metadata.required_auth_level = speculation.predicted_auth_level
+        self.speculative_turns[call_id] = speculation
+        self.logger.info(f"Speculating auth level {speculation.predicted_auth_level} ({predicted_call_reason}, confidence {confidence:.2f}) while classifying")
+        return speculation
+
+    def _resolve_speculative_turn(self, call_id: str, speculation: SpeculativeTurn):
+        # The guess holds when the call reason needs the predicted auth level, the agents were then routed as they
+        # would have been after the classifier agent
+        if speculation.confirmed is not None or not speculation.classification.done():
+            return
+
+        if not speculation.classification.cancelled():
+            speculation.call_reason_classification = speculation.classification.result()
+        speculation.confirmed = (speculation.call_reason_classification is not None and
+                                 self.call_reason_classification_to_risk_level[speculation.call_reason_classification] == speculation.predicted_auth_level)
+
+        if speculation.confirmed:
+            self.save_call_reason_classification(call_id, speculation.call_reason_classification)
+        else:
+            speculation.cancellation_token.cancel()
+        speculation.resolved.set()
+
+    async def _stream_speculative_turn(self,
+                                       call_id: str,
+                                       group_chat: SelectorGroupChat,
+                                       prompt: str,
+                                       speculation: SpeculativeTurn,
+                                       cancellation_token: Optional[CancellationToken]) -> AsyncIterator[str]:
+        """Hold the speculative run's sentences back until the guess is confirmed, roll back and rerun the turn when it is not."""
+        buffered_sentences = []
+        sentences = self._stream_turn(group_chat, prompt, speculation.cancellation_token)
+        next_sentence = None
+        resolved = asyncio.ensure_future(speculation.resolved.wait())
+        try:
+            try:
+                while True:
+                    # Until the guess is known the next sentence races its confirmation, which releases the held back
+                    # sentences right away rather than with the next sentence
+                    next_sentence = asyncio.ensure_future(anext(sentences))
+                    if speculation.confirmed is None:
+                        await asyncio.wait([next_sentence, resolved], return_when=asyncio.FIRST_COMPLETED)
+                    if speculation.confirmed:
+                        for buffered_sentence in buffered_sentences:
+                            yield buffered_sentence
+                        buffered_sentences.clear()
+
+                    try:
+                        sentence = await next_sentence
+                    except StopAsyncIteration:
+                        break
+                    if speculation.confirmed is None:
+                        buffered_sentences.append(sentence)
+                    elif speculation.confirmed:
+                        yield sentence
+            except asyncio.CancelledError:
+                # Only the cancellation of a wrong guess is handled here, not the caller's
+                if (speculation.confirmed is not False or asyncio.current_task().cancelling()
+                        or (cancellation_token is not None and cancellation_token.is_cancelled())):
+                    raise
+            finally:
+                resolved.cancel()
+                if next_sentence is not None and not next_sentence.done():
+                    next_sentence.cancel()
+                    await asyncio.wait([next_sentence])
+                await sentences.aclose()
+
+            await asyncio.wait([speculation.classification])
+            self._resolve_speculative_turn(call_id, speculation)
+        finally:
+            self.speculative_turns.pop(call_id, None)
+            speculation.classification.cancel()
+
+        if speculation.confirmed:
+            for buffered_sentence in buffered_sentences:
+                yield buffered_sentence
+            return
+
+        self.logger.info(f"Speculative turn rolled back, call reason is {speculation.call_reason_classification}")
+        await self._roll_back_speculative_turn(call_id, group_chat, speculation)
+        async for sentence in self._stream_turn(group_chat, prompt, cancellation_token):
+            yield sentence
+
+    async def _roll_back_speculative_turn(self, call_id: str, group_chat: SelectorGroupChat, speculation: SpeculativeTurn):
+        if speculation.team_state is not None:
+            await group_chat.load_state(speculation.team_state)
+        else:
+            await group_chat.reset()
+
+        call_metadata = self.get_call_metadata(call_id)
+        for field, value in speculation.call_metadata:
+            setattr(call_metadata, field, value)
+
+        # The rerun goes straight to the right agents, only an unclassified transcript still needs the classifier agent
+        if speculation.call_reason_classification is not None:
+            self.save_call_reason_classification(call_id, speculation.call_reason_classification)
 
-        response_text = sanitize_message(result.messages[-1].content.split("TERMINATE")[0])
 
-        return response_text
+    async def end_call(self, call_id: str):
+        await self.team_cache.end_call(call_id)
+        model_usage = get_model_usage_ledger().end_call(call_id)
+        self.logger.info(f"Model usage for call {call_id}: {model_usage}")
@@ -0,0 +1,166 @@
+import re
+from difflib import SequenceMatcher
+from typing import List, Optional
+
+UNITS = {"zero": 0, "oh": 0, "o": 0, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7, "eight": 8, "nine": 9}
+TEENS = {"ten": 10, "eleven": 11, "twelve": 12, "thirteen": 13, "fourteen": 14, "fifteen": 15, "sixteen": 16, "seventeen": 17,
+         "eighteen": 18, "nineteen": 19}
+TENS = {"twenty": 20, "thirty": 30, "forty": 40, "fifty": 50, "sixty": 60, "seventy": 70, "eighty": 80, "ninety": 90}
+REPEATS = {"double": 2, "triple": 3}
+
+# Words after a number that make it an amount rather than a card number
+AMOUNT_WORDS = {"dollar", "dollars", "buck", "bucks", "cent", "cents", "percent", "usd"}
+
+ADDRESS_ABBREVIATIONS = {
+    "street": "st", "avenue": "ave", "av": "ave", "road": "rd", "drive": "dr", "boulevard": "blvd", "lane": "ln", "court": "ct",
+    "place": "pl", "terrace": "ter", "circle": "cir", "highway": "hwy", "parkway": "pkwy", "square": "sq", "apartment": "apt",
+    "suite": "ste", "north": "n", "south": "s", "east": "e", "west": "w", "first": "1st", "second": "2nd", "third": "3rd",
+    "alabama": "al", "alaska": "ak", "arizona": "az", "arkansas": "ar", "california": "ca", "colorado": "co", "connecticut": "ct",
+    "delaware": "de", "florida": "fl", "georgia": "ga", "hawaii": "hi", "idaho": "id", "illinois": "il", "indiana": "in",
+    "iowa": "ia", "kansas": "ks", "kentucky": "ky", "louisiana": "la", "maine": "me", "maryland": "md", "massachusetts": "ma",
+    "michigan": "mi", "minnesota": "mn", "mississippi": "ms", "missouri": "mo", "montana": "mt", "nebraska": "ne", "nevada": "nv",
+    "ohio": "oh", "oklahoma": "ok", "oregon": "or", "pennsylvania": "pa", "tennessee": "tn", "texas": "tx", "utah": "ut",
+    "vermont": "vt", "virginia": "va", "washington": "wa", "wisconsin": "wi", "wyoming": "wy"
+}
+# Words a customer may say between the parts of their address
+ADDRESS_FILLER_WORDS = {"and", "in", "the", "city", "of", "state", "zip", "code", "postal", "comma", "um", "uh", "its", "is"}
+
+MULTI_WORD_STATES = {
+    "new hampshire": "nh", "new jersey": "nj", "new mexico": "nm", "new york": "ny", "north carolina": "nc",
+    "north dakota": "nd", "rhode island": "ri", "south carolina": "sc", "south dakota": "sd", "west virginia": "wv"
+}
+
+
+class AuthVerifier:
+    """
+    Checks the authentication details a customer speaks against the values on file, without a model round trip.
+
+    Numbers are extracted from digits and spoken forms ("four four four four", "forty four forty four", "double four",
+    "four hundred eleven") and adjacent numbers are joined, as customers read card and house numbers in groups.
+    Addresses are normalized (abbreviations, state names) and must appear in order, numbers exactly and words
+    fuzzily to tolerate transcription errors. Each check returns None when the transcript holds nothing to
+    check, so the caller can fall back to an LLM authenticator. A transcript offering several different candidates
+    (e.g. "1111 or 1234") is never a match, one utterance gets one guess.
+    """
+
+    def __init__(self, min_word_similarity: float = 0.8):
+        self.min_word_similarity = min_word_similarity
+
+    @staticmethod
+    def _words(text: str) -> List[str]:
+        text = re.sub(r"(?<=\d)[,\-\s](?=\d)", " ", text.lower())
+        return re.findall(r"[a-z]+|\d+", text.replace("'", ""))
+
+    @classmethod
+    def tokenize(cls, text: str) -> List[str]:
+        """Words with spoken numbers converted to digits and adjacent numbers joined into one token."""
+        tokens, index = [], 0
+        words = cls._words(text)
+        while index < len(words):
+            number, index = cls._parse_number(words, index)
+            if number is None:
+                tokens.append(words[index])
+                index += 1
+            elif tokens and tokens[-1].isdigit():
+                tokens[-1] += number
+            else:
+                tokens.append(number)
+        return tokens
+
+    @staticmethod
+    def _parse_number(words: List[str], index: int) -> tuple:
+        """Parse one spoken number starting at index, returns (digits or None, next index)."""
+        word = words[index]
+        if word.isdigit():
+            return word, index + 1
+
+        next_word = words[index + 1] if index + 1 < len(words) else None
+        if word in REPEATS and next_word is not None and (next_word in UNITS or (next_word.isdigit() and len(next_word) == 1)):
+            digit = str(UNITS.get(next_word, next_word))
+            return digit * REPEATS[word], index + 2
+
+        # "o" and "oh" only count as zero before other numbers, e.g. "four oh four"
+        if word in UNITS and word not in ("o", "oh"):
+            if next_word == "hundred":
+                value, index = UNITS[word] * 100, index + 2
+                if index < len(words) and words[index] == "and":
+                    index += 1
+                if index < len(words) and words[index] in TEENS:
+                    return str(value + TEENS[words[index]]), index + 1
+                if index < len(words) and words[index] in TENS:
+                    value += TENS[words[index]]
+                    index += 1
+                if index < len(words) and words[index] in UNITS and words[index] not in ("o", "oh"):
+                    value += UNITS[words[index]]
+                    index += 1
+                return str(value), index
+            return str(UNITS[word]), index + 1
+
+        if word in ("o", "oh") and next_word is not None and (next_word in UNITS or next_word in TEENS or next_word in TENS or next_word.isdigit()):
+            return "0", index + 1
+
+        if word in TEENS:
+            return str(TEENS[word]), index + 1
+
+        if word in TENS:
+            if next_word in UNITS and next_word not in ("zero", "oh", "o"):
+                return str(TENS[word] + UNITS[next_word]), index + 2
+            return str(TENS[word]), index + 1
+
+        return None, index
+
+    def verify_card_last_4_digits(self, transcript: str, card_number_last_4_digits: str) -> Optional[bool]:
+        """
+        True if the customer said the card's last 4 digits (or the whole number) and no other number, False for a
+        wrong or ambiguous answer, None if they gave no card number.
+        """
+        # Amounts ("$1,234", "1234 dollars") are never card numbers
+        tokens = self.tokenize(re.sub(r"\$\s*[\d,.]+", " ", transcript))
+        numbers = {token for index, token in enumerate(tokens)
+                   if token.isdigit() and len(token) >= 4 and (index + 1 == len(tokens) or tokens[index + 1] not in AMOUNT_WORDS)}
+        if not numbers:
+            return None
+        return len(numbers) == 1 and numbers.pop().endswith(card_number_last_4_digits)
+
+    def normalize_address(self, address: str) -> List[str]:
+        # The Ohio abbreviation before a zip code is not a spoken zero
+        text = re.sub(r"\boh(?= \d{5}\b)", "ohio", " ".join(self._words(address)))
+        for state, abbreviation in MULTI_WORD_STATES.items():
+            text = re.sub(rf"\b{state}\b", abbreviation, text)
+        return [ADDRESS_ABBREVIATIONS.get(token, token) for token in self.tokenize(text)]
+
+    def verify_address(self, transcript: str, customer_address: str) -> Optional[bool]:
+        """
+        True if the transcript holds the address on file in order, False if its street numbers and zip code are not
+        exactly those on file, None if it holds no address (no numbers) or cannot be matched with certainty.
+        """
+        spoken = self.normalize_address(transcript)
+        expected = self.normalize_address(customer_address)
+        spoken_numbers = sorted(token for token in spoken if token.isdigit())
+        if not spoken_numbers:
+            return None
+
+        # Missing, extra or alternative street numbers and zip codes are a wrong answer
+        if spoken_numbers != sorted(token for token in expected if token.isdigit()):
+            return False
+
+        # The address on file must appear as an ordered sequence, e.g. street before city before zip
+        matched_positions, position = [], 0
+        for token in expected:
+            while position < len(spoken) and not self._address_token_matches(token, spoken[position]):
+                position += 1
+            if position == len(spoken):
+                return None
+            matched_positions.append(position)
+            position += 1
+
+        # Anything but filler within the address (e.g. "Main or Elm St") is left to the authenticator to judge
+        unmatched_positions = set(range(matched_positions[0], matched_positions[-1] + 1)) - set(matched_positions)
+        if any(spoken[position] not in ADDRESS_FILLER_WORDS for position in unmatched_positions):
+            return None
+        return True
+
+    def _address_token_matches(self, expected: str, spoken: str) -> bool:
+        if expected.isdigit() or spoken.isdigit():
+            return expected == spoken
+        return expected == spoken or SequenceMatcher(None, expected, spoken).ratio() >= self.min_word_similarity
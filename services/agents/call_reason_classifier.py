@@ -0,0 +1,166 @@
+import math
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+
+# Phrases that on their own identify a call reason
+CALL_REASON_KEYWORDS: Dict[str, List[str]] = {
+    "General Product/Benefits Inquiry": ["benefits", "card benefits", "what products", "annual fee waived", "travel insurance"],
+    "Transaction Inquiry": ["transaction", "a charge i don't recognize", "purchase on my statement", "pending charge"],
+    "Fraud/Claims": ["fraud", "fraudulent", "scam", "identity theft", "someone used my card", "unauthorized"],
+    "Account Opening": ["open an account", "open a new account", "new checking account", "new savings account", "apply for a card"],
+    "Payment Processing": ["payment didn't go through", "payment is pending", "bill pay", "payment processing", "autopay"],
+    "Account Balance Inquiry": ["balance", "how much money", "available funds", "how much do i have"],
+    "Lost or Stolen Card Reporting": ["lost my card", "stolen", "can't find my card", "card was taken", "misplaced my card", "lost card"],
+    "Online Banking Technical Support": ["online banking", "website", "log in", "login", "password", "locked out"],
+    "Loan/Mortgage Inquiry": ["loan", "mortgage", "refinance", "interest rate on my home", "auto loan", "heloc"],
+    "Wire Transfer Assistance": ["wire", "wire transfer", "send money internationally", "routing number for a wire", "swift"],
+    "Credit Card Payment Assistance": ["pay my credit card", "credit card payment", "minimum payment", "card payment due"],
+    "Dispute/Chargeback Request": ["dispute", "chargeback", "charged twice", "refund never", "never received the item"],
+    "Account Information Update": ["update my address", "change my address", "change my phone", "update my email", "change my name"],
+    "Rewards Points Inquiry": ["rewards", "points", "cash back", "redeem", "ultimate rewards"],
+    "Overdraft/NSF Assistance": ["overdraft", "overdrawn", "insufficient funds", "nsf", "bounced"],
+    "Investment Account Inquiry": ["investment", "brokerage", "stocks", "ira", "401k", "portfolio", "retirement account"],
+    "Mobile App Technical Issue": ["mobile app", "the app", "app keeps crashing", "app won't", "app isn't working"],
+    "Fee or Charge Explanation": ["fee", "why was i charged", "service charge", "monthly fee", "late fee", "annual fee"],
+    "Check Deposit Issues": ["deposit a check", "check deposit", "mobile deposit", "check hasn't cleared", "deposited a check"],
+    "Foreign Transaction Inquiry": ["foreign transaction", "abroad", "overseas", "international purchase", "currency conversion", "traveling"],
+}
+
+# Example requests per call reason for the nearest neighbour index
+CALL_REASON_EXAMPLES: Dict[str, List[str]] = {
+    "General Product/Benefits Inquiry": ["What benefits come with my sapphire card", "Can you tell me about your credit card products"],
+    "Transaction Inquiry": ["I see a transaction on my account I want to ask about", "Can you tell me what this charge from yesterday is"],
+    "Fraud/Claims": ["I think someone is using my account without permission", "I want to report fraud on my account"],
+    "Account Opening": ["I would like to open a checking account", "How do I open a savings account with you"],
+    "Payment Processing": ["My payment has not been processed yet", "I made a payment and it has not posted"],
+    "Account Balance Inquiry": ["What is my checking account balance", "Can you tell me how much is in my savings account"],
+    "Lost or Stolen Card Reporting": ["My wallet was stolen with my debit card in it", "I lost my credit card and need a new one"],
+    "Online Banking Technical Support": ["I can't sign in to my account online", "I forgot my password for online banking"],
+    "Loan/Mortgage Inquiry": ["I have a question about my mortgage payment", "What rates do you have for a home loan"],
+    "Wire Transfer Assistance": ["I need to wire money to another bank", "Can you help me send a wire transfer"],
+    "Credit Card Payment Assistance": ["I want to make a payment on my credit card", "When is my credit card payment due"],
+    "Dispute/Chargeback Request": ["I want to dispute a charge on my card", "The merchant never refunded me and I want my money back"],
+    "Account Information Update": ["I need to update my mailing address", "I want to change the phone number on my account"],
+    "Rewards Points Inquiry": ["How many rewards points do I have", "I want to redeem my points for travel"],
+    "Overdraft/NSF Assistance": ["I was charged an overdraft fee", "My account is overdrawn what can I do"],
+    "Investment Account Inquiry": ["I have a question about my brokerage account", "How is my retirement portfolio doing"],
+    "Mobile App Technical Issue": ["The mobile app keeps crashing when I open it", "I can't log in to the app on my phone"],
+    "Fee or Charge Explanation": ["Why was I charged a monthly service fee", "Can you explain this fee on my statement"],
+    "Check Deposit Issues": ["My check deposit has not shown up", "The app won't let me deposit a check"],
+    "Foreign Transaction Inquiry": ["I was charged a fee for a purchase overseas", "I am traveling abroad and want to use my card"],
+}
+
+STOP_WORDS = {"a", "an", "the", "i", "my", "me", "to", "and", "or", "is", "it", "on", "of", "for", "in", "with", "can",
+              "you", "your", "do", "have", "want", "would", "like", "need", "please", "that", "this", "be", "am", "was",
+              "what", "how", "hi", "hello", "yes", "so", "um", "uh", "just", "ok", "okay", "thank", "thanks", "else", "help"}
+
+
+class CallReasonClassifier:
+    """
+    Classifies customer transcripts into call reasons locally, without an LLM round trip.
+
+    Keyword rules settle the clear cases: when at least min_keyword_hits of one call reason's phrases match, more
+    than any other's, it wins outright. Otherwise the transcript is compared against a TF-IDF index (word unigrams and bigrams) of each
+    call reason's name, keywords and examples, and the nearest reason is returned only when it shares at least
+    min_overlapping_terms words with the transcript (a single shared word says little, however similar it scores)
+    and its cosine similarity and margin over the runner up clear the thresholds. A transcript matching any phrase
+    of a high risk reason other than the winner (e.g. "a late fee on my mortgage") is never settled locally.
+    Low confidence transcripts return None so the caller can fall back to the LLM classifier.
+    """
+
+    def __init__(self,
+                 call_reasons: Iterable[str],
+                 min_similarity: float = 0.3,
+                 min_margin: float = 0.08,
+                 min_overlapping_terms: int = 2,
+                 min_keyword_hits: int = 2,
+                 high_risk_reasons: Iterable[str] = ()):
+        self.call_reasons = list(call_reasons)
+        self.min_keyword_hits = min_keyword_hits
+        self.high_risk_reasons = set(high_risk_reasons)
+        self.min_similarity = min_similarity
+        self.min_margin = min_margin
+        self.min_overlapping_terms = min_overlapping_terms
+
+        self.keyword_patterns = {
+            call_reason: [re.compile(r"\b" + re.escape(keyword) + r"\b") for keyword in CALL_REASON_KEYWORDS.get(call_reason, [])]
+            for call_reason in self.call_reasons
+        }
+
+        # Build the TF-IDF index once, one row per example
+        documents, self.document_reasons = [], []
+        for call_reason in self.call_reasons:
+            for document in [call_reason.replace("/", " ")] + CALL_REASON_KEYWORDS.get(call_reason, []) + CALL_REASON_EXAMPLES.get(call_reason, []):
+                documents.append(self.tokenize(document))
+                self.document_reasons.append(call_reason)
+
+        document_frequency = Counter(term for document in documents for term in set(document))
+        self.vocabulary = {term: index for index, term in enumerate(sorted(document_frequency))}
+        self.idf = np.array([math.log((1 + len(documents)) / (1 + document_frequency[term])) + 1 for term in sorted(document_frequency)],
+                            dtype=np.float32)
+        self.index = np.stack([self._vectorize(document) for document in documents])
+        self.document_words = [{term for term in document if " " not in term} for document in documents]
+
+    @staticmethod
+    def tokenize(text: str) -> List[str]:
+        words = [word for word in re.findall(r"[a-z0-9]+", text.lower().replace("'", "")) if word not in STOP_WORDS]
+        words = [word[:-1] if len(word) > 3 and word.endswith("s") and not word.endswith("ss") else word for word in words]
+        return words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+
+    def _vectorize(self, terms: List[str]) -> np.ndarray:
+        vector = np.zeros(len(self.vocabulary), dtype=np.float32)
+        for term, count in Counter(terms).items():
+            index = self.vocabulary.get(term)
+            if index is not None:
+                vector[index] = (1 + math.log(count)) * self.idf[index]
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def classify(self, transcript: str) -> Tuple[Optional[str], float]:
+        """Return the call reason and a confidence in [0, 1], the reason is None when not confident."""
+        call_reason, confidence, margin, overlapping_terms = self._rank(transcript)
+        if any(self._keyword_hits(transcript)[reason] for reason in self.high_risk_reasons if reason != call_reason):
+            return None, confidence
+        if confidence >= self.min_similarity and margin >= self.min_margin and (overlapping_terms is None or overlapping_terms >= self.min_overlapping_terms):
+            return call_reason, confidence
+        return None, confidence
+
+    def predict(self, transcript: str) -> Tuple[Optional[str], float]:
+        """Return the most likely call reason whatever the confidence, None only when nothing matches at all."""
+        call_reason, confidence, _, _ = self._rank(transcript)
+        return (call_reason, confidence) if confidence > 0 else (None, confidence)
+
+    @staticmethod
+    def _normalize(transcript: str) -> str:
+        return transcript.lower().replace("’", "'")
+
+    def _keyword_hits(self, transcript: str) -> Dict[str, int]:
+        text = self._normalize(transcript)
+        return {call_reason: sum(1 for pattern in patterns if pattern.search(text)) for call_reason, patterns in self.keyword_patterns.items()}
+
+    def _rank(self, transcript: str) -> Tuple[str, float, float, Optional[int]]:
+        """
+        Best call reason, its confidence, its margin over the runner up and the words its nearest example shares
+        with the transcript (None for keyword matches).
+        """
+        keyword_hits = self._keyword_hits(transcript)
+        ranked_hits = sorted(keyword_hits.values(), reverse=True)
+        if ranked_hits and ranked_hits[0] >= self.min_keyword_hits and (len(ranked_hits) == 1 or ranked_hits[0] > ranked_hits[1]):
+            return max(keyword_hits, key=keyword_hits.get), 1.0, 1.0, None
+
+        terms = self.tokenize(self._normalize(transcript))
+        similarities = self.index @ self._vectorize(terms)
+        best_by_reason: Dict[str, Tuple[float, int]] = {}  # Call reason -> (similarity, document index)
+        for document_index, (call_reason, similarity) in enumerate(zip(self.document_reasons, similarities)):
+            if call_reason not in best_by_reason or similarity > best_by_reason[call_reason][0]:
+                best_by_reason[call_reason] = (float(similarity), document_index)
+
+        ranked = sorted(best_by_reason.items(), key=lambda item: item[1][0], reverse=True)
+        best_reason, (best_similarity, best_document) = ranked[0]
+        margin = best_similarity - (ranked[1][1][0] if len(ranked) > 1 else 0.0)
+        overlapping_terms = len(self.document_words[best_document] & set(terms))
+        return best_reason, best_similarity, margin, overlapping_terms
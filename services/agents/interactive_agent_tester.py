@@ -8,6 +8,8 @@ if __name__ == "__main__":
     dotenv.load_dotenv()
     agentic_service = AgenticService()
 
+    # Agent teams stay alive between prompts, so every prompt must run on the same event loop
+    loop = asyncio.new_event_loop()
     while True:
         user_input = input("Enter prompt: ")
-        asyncio.run(agentic_service.process_async(user_input, "call-id-1"))
+        loop.run_until_complete(agentic_service.process_async(user_input, "call-id-1"))
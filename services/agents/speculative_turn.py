@@ -0,0 +1,34 @@
+import asyncio
+from typing import Any, Mapping, Optional
+
+from autogen_core import CancellationToken
+
+from schemas.agent_call_metadata import AgentCallMetadata
+
+
+class SpeculativeTurn:
+    """
+    A turn whose agents run on a predicted auth level while the call reason is still being classified.
+
+    The team state and call metadata from before the turn are kept so the turn can be rolled back, and the run
+    has its own cancellation token (also cancelled with the caller's) so a wrong guess can be cancelled without
+    cancelling the turn.
+    """
+
+    def __init__(self,
+                 predicted_auth_level: str,
+                 classification: asyncio.Task,  # Resolves to the call reason, None when it could not be classified
+                 team_state: Optional[Mapping[str, Any]],  # None when the team had not run yet
+                 call_metadata: AgentCallMetadata,
+                 cancellation_token: Optional[CancellationToken] = None):
+        self.predicted_auth_level = predicted_auth_level
+        self.classification = classification
+        self.team_state = team_state
+        self.call_metadata = call_metadata
+        self.call_reason_classification: Optional[str] = None
+        self.confirmed: Optional[bool] = None  # None until the classification is known
+        self.resolved = asyncio.Event()  # Set once confirmed is known
+
+        self.cancellation_token = CancellationToken()
+        if cancellation_token is not None:
+            cancellation_token.add_callback(self.cancellation_token.cancel)
@@ -0,0 +1,140 @@
+import asyncio
+import logging
+from typing import Any, List, Mapping, Optional, Set
+
+from autogen_core.model_context import ChatCompletionContext
+from autogen_core.models import AssistantMessage, ChatCompletionClient, FunctionExecutionResultMessage, LLMMessage, SystemMessage, UserMessage
+from pydantic import BaseModel, Field
+
+from clients.llm_client_pool import start_background_work
+from utilities.logging_utils import configure_logger
+
+
+class ConversationSummarizer:
+    """Folds conversation messages into a short rolling summary using a (cheaper) model."""
+
+    system_message = """
+    You maintain a running summary of a phone call between a JPMorganChase customer and call center specialists.
+    Update the existing summary with the new messages. Keep every fact the specialists may need later: what the
+    customer asked for, details they provided, what was confirmed or completed and anything still outstanding.
+    Do not include authentication secrets such as card numbers or addresses, only whether authentication succeeded.
+    Reply with the updated summary only, in at most 120 words.
+    """
+
+    def __init__(self, model_client: ChatCompletionClient):
+        self.model_client = model_client
+
+    async def summarize(self, summary: str, messages: List[LLMMessage]) -> str:
+        transcript = "\n".join(f"{getattr(message, 'source', 'tool')}: {message.content}" for message in messages)
+        result = await self.model_client.create([
+            SystemMessage(content=self.system_message),
+            UserMessage(content=f"Existing summary:\n{summary or 'None'}\n\nNew messages:\n{transcript}", source="user")
+        ])
+        return str(result.content).strip()
+
+
+class SummarizingChatCompletionContextState(BaseModel):
+    messages: List[LLMMessage] = Field(default_factory=list)
+    summary: str = ""
+
+
+class SummarizingChatCompletionContext(ChatCompletionContext):
+    """
+    Model context that keeps prompt size flat however long the call runs. The agent's system prompt is added by
+    the agent, this context returns a summary of the earlier conversation followed by the last recent_turns
+    customer turns verbatim.
+
+    Once more turns have completed, the oldest ones are folded into the summary by a background task, so the
+    summary model never delays a turn; until it finishes those turns are simply still sent in full. Without a
+    summarizer old turns are dropped. Tool calls and their results, and messages from transient sources (e.g. the
+    classifier's saved classification), are only kept for the turn they happened in: by then their results are
+    recorded in the call metadata.
+    """
+
+    def __init__(self,
+                 summarizer: Optional[ConversationSummarizer] = None,
+                 recent_turns: int = 4,
+                 transient_sources: Optional[Set[str]] = None,
+                 turn_source: str = "user"):
+        super().__init__()
+        self.logger = configure_logger('summarizing_chat_completion_context_logger', logging.INFO)
+        self.summarizer = summarizer
+        self.recent_turns = recent_turns
+        self.transient_sources = transient_sources or set()
+        self.turn_source = turn_source
+        self.summary = ""
+        self.summary_task: Optional[asyncio.Task] = None
+
+    async def add_message(self, message: LLMMessage) -> None:
+        await super().add_message(message)
+        if self._is_turn_start(message):
+            self._fold_old_turns()
+
+    async def get_messages(self) -> List[LLMMessage]:
+        turn_starts = self._turn_starts()
+        current_turn_start = turn_starts[-1] if turn_starts else 0
+
+        messages = [message for index, message in enumerate(self._messages)
+                    if index >= current_turn_start or not self._is_transient(message)]
+        if self.summary:
+            messages.insert(0, SystemMessage(content=f"Summary of the earlier conversation: {self.summary}"))
+        return messages
+
+    async def clear(self) -> None:
+        await super().clear()
+        self.summary = ""
+        if self.summary_task is not None:
+            self.summary_task.cancel()
+            self.summary_task = None
+
+    async def save_state(self) -> Mapping[str, Any]:
+        return SummarizingChatCompletionContextState(messages=self._messages, summary=self.summary).model_dump()
+
+    async def load_state(self, state: Mapping[str, Any]) -> None:
+        context_state = SummarizingChatCompletionContextState.model_validate(state)
+        self._messages = context_state.messages
+        self.summary = context_state.summary
+
+    def _is_turn_start(self, message: LLMMessage) -> bool:
+        return isinstance(message, UserMessage) and message.source == self.turn_source
+
+    def _is_transient(self, message: LLMMessage) -> bool:
+        if isinstance(message, FunctionExecutionResultMessage):
+            return True
+        if isinstance(message, AssistantMessage) and not isinstance(message.content, str):
+            return True
+        return getattr(message, "source", None) in self.transient_sources
+
+    def _turn_starts(self) -> List[int]:
+        return [index for index, message in enumerate(self._messages) if self._is_turn_start(message)]
+
+    def _fold_old_turns(self):
+        if self.summary_task is not None and not self.summary_task.done():
+            return
+
+        turn_starts = self._turn_starts()
+        if len(turn_starts) <= self.recent_turns:
+            return
+
+        # Everything before the oldest turn that is kept verbatim
+        fold_count = turn_starts[-self.recent_turns] if self.recent_turns > 0 else turn_starts[-1]
+        if self.summarizer is None:
+            del self._messages[:fold_count]
+            return
+
+        self.summary_task = asyncio.create_task(self._summarize(fold_count))
+
+    async def _summarize(self, fold_count: int):
+        start_background_work()
+        folded_messages = [message for message in self._messages[:fold_count] if not self._is_transient(message)]
+        folded_first_message = self._messages[0]
+        try:
+            summary = await self.summarizer.summarize(self.summary, folded_messages)
+        except Exception as e:
+            self.logger.warning(f"Conversation summary failed, keeping the full history for now: {str(e)}")
+            return
+
+        # Messages are only appended while summarizing, unless the context was cleared or reloaded meanwhile
+        if self._messages and self._messages[0] is folded_first_message:
+            del self._messages[:fold_count]
+            self.summary = summary
@@ -0,0 +1,98 @@
+import logging
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+import soundfile as sf
+
+from utilities.audio_codec import StreamingResampler
+from utilities.file_retention import sweep_directory
+from utilities.logging_utils import configure_logger
+
+
+class AudioArchiveWriter:
+    """
+    Archives specialist audio from a background thread so disk I/O never runs in the request path.
+
+    Clips are queued on a bounded queue (clips are dropped with a warning if the writer falls behind)
+    and written in batches in a compact format: 8kHz u-law WAV ("ulaw") or 8kHz FLAC ("flac"), matching
+    the phone leg, or the original 24kHz 16-bit WAV ("pcm_16"). A periodic sweep deletes archived clips
+    older than the retention period and then the oldest clips until the archive is within its quota.
+    """
+
+    archive_formats = {
+        "ulaw": ("wav", "WAV", "ULAW", 8000),
+        "flac": ("flac", "FLAC", "PCM_16", 8000),
+        "pcm_16": ("wav", "WAV", "PCM_16", None)
+    }
+
+    def __init__(self,
+                 archive_directory: str,
+                 archive_format: str = "ulaw",
+                 input_sample_rate: int = 24000,
+                 max_queued_clips: int = 200,
+                 max_batch_size: int = 16,
+                 retention_seconds: float = 30 * 24 * 3600.0,
+                 quota_bytes: int = 1024 * 1024 * 1024,
+                 sweep_interval: float = 300.0):
+        self.logger = configure_logger('audio_archive_writer_logger', logging.INFO)
+        self.archive_directory = archive_directory
+        self.file_extension, self.file_format, self.subtype, sample_rate = self.archive_formats[archive_format]
+        self.input_sample_rate = input_sample_rate
+        self.sample_rate = sample_rate or input_sample_rate
+        self.max_batch_size = max_batch_size
+        self.retention_seconds = retention_seconds
+        self.quota_bytes = quota_bytes
+        self.sweep_interval = sweep_interval
+        os.makedirs(archive_directory, exist_ok=True)
+
+        self.pending: queue.Queue = queue.Queue(maxsize=max_queued_clips)
+        self.clips_dropped = 0
+        self.last_sweep = 0.0
+        threading.Thread(target=self._run, name='audio-archive-writer', daemon=True).start()
+
+    def archive(self, clip_name: str, audio: np.ndarray):
+        """Queue a clip (file name without extension) for archiving, never blocks."""
+        try:
+            self.pending.put_nowait((clip_name, audio))
+        except queue.Full:
+            self.clips_dropped += 1
+            self.logger.warning(f"Archive queue full, dropped clip {clip_name} ({self.clips_dropped} dropped so far)")
+
+    def _next_batch(self, timeout: float) -> list:
+        try:
+            batch = [self.pending.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(self.pending.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            for clip_name, audio in self._next_batch(timeout=self.sweep_interval):
+                self._write_clip(clip_name, audio)
+
+            if time.monotonic() - self.last_sweep >= self.sweep_interval:
+                self.last_sweep = time.monotonic()
+                self._sweep()
+
+    def _write_clip(self, clip_name: str, audio: np.ndarray):
+        try:
+            if self.sample_rate != self.input_sample_rate:
+                audio = StreamingResampler(self.input_sample_rate, self.sample_rate).process(audio)
+            sf.write(os.path.join(self.archive_directory, f"{clip_name}.{self.file_extension}"), audio, self.sample_rate,
+                     format=self.file_format, subtype=self.subtype)
+        except Exception as e:
+            self.logger.error(f"Failed to archive clip {clip_name}: {str(e)}")
+
+    def _sweep(self):
+        deleted, retained_bytes = sweep_directory(self.archive_directory, f"-specialist.{self.file_extension}", self.retention_seconds,
+                                                  self.quota_bytes, self.logger)
+        if deleted:
+            self.logger.info(f"Archive sweep deleted {deleted} clips, {retained_bytes / (1024 * 1024):.1f}MB retained")
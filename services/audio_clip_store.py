@@ -0,0 +1,110 @@
+import logging
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from utilities.file_retention import sweep_directory
+from utilities.logging_utils import configure_logger
+
+
+class AudioClipStore:
+    """
+    Keeps recently generated audio clips (encoded files) in memory so /twilio-play can serve them without
+    touching the filesystem. Clips expire after the TTL and the least recently used clips are evicted once
+    the byte budget is exceeded. When a write-behind directory is configured clips are also written to disk
+    by a background thread, off the playback path, from a bounded queue (clips are dropped with a warning if
+    the writer falls behind). A periodic sweep deletes written specialist clips older than the retention
+    period and then the oldest ones until the directory is within its quota.
+    """
+
+    def __init__(self,
+                 memory_budget_bytes: int = 256 * 1024 * 1024,
+                 clip_ttl: float = 600.0,  # Seconds a clip stays playable
+                 write_behind_directory: Optional[str] = None,
+                 max_queued_clips: int = 200,
+                 retention_seconds: float = 24 * 3600.0,
+                 quota_bytes: int = 1024 * 1024 * 1024,
+                 sweep_interval: float = 300.0):
+        self.logger = configure_logger('audio_clip_store_logger', logging.INFO)
+        self.memory_budget_bytes = memory_budget_bytes
+        self.clip_ttl = clip_ttl
+        self.write_behind_directory = write_behind_directory
+        self.retention_seconds = retention_seconds
+        self.quota_bytes = quota_bytes
+        self.sweep_interval = sweep_interval
+
+        self.clips: OrderedDict[str, Tuple[bytes, float]] = OrderedDict()  # File name -> (clip, expiry)
+        self.memory_bytes = 0
+        self.lock = threading.Lock()
+
+        self.write_behind_queue: Optional[queue.Queue] = None
+        self.clips_dropped = 0
+        self.last_sweep = 0.0
+        if write_behind_directory:
+            self.write_behind_queue = queue.Queue(maxsize=max_queued_clips)
+            threading.Thread(target=self._run_write_behind, name='audio-clip-write-behind', daemon=True).start()
+
+    def put(self, file_name: str, clip: bytes):
+        with self.lock:
+            self._remove(file_name)
+            self.clips[file_name] = (clip, time.monotonic() + self.clip_ttl)
+            self.memory_bytes += len(clip)
+            self._evict(time.monotonic())
+
+        if self.write_behind_queue is not None:
+            try:
+                self.write_behind_queue.put_nowait((file_name, clip))
+            except queue.Full:
+                self.clips_dropped += 1
+                self.logger.warning(f"Write-behind queue full, clip {file_name} kept in memory only ({self.clips_dropped} dropped so far)")
+
+    def get(self, file_name: str) -> Optional[bytes]:
+        with self.lock:
+            entry = self.clips.get(file_name)
+            if entry is None:
+                return None
+            clip, expires_at = entry
+            if expires_at <= time.monotonic():
+                self._remove(file_name)
+                return None
+            self.clips.move_to_end(file_name)
+            return clip
+
+    def _remove(self, file_name: str):
+        entry = self.clips.pop(file_name, None)
+        if entry is not None:
+            self.memory_bytes -= len(entry[0])
+
+    def _evict(self, now: float):
+        # Drop expired clips, then the least recently used ones until the store is within budget
+        for file_name in [file_name for file_name, (_, expires_at) in self.clips.items() if expires_at <= now]:
+            self._remove(file_name)
+        while self.memory_bytes > self.memory_budget_bytes and self.clips:
+            file_name, (clip, _) = self.clips.popitem(last=False)
+            self.memory_bytes -= len(clip)
+
+    def _run_write_behind(self):
+        while True:
+            try:
+                file_name, clip = self.write_behind_queue.get(timeout=self.sweep_interval)
+            except queue.Empty:
+                file_name = None
+            if file_name is not None:
+                try:
+                    with open(os.path.join(self.write_behind_directory, file_name), 'wb') as f:
+                        f.write(clip)
+                except OSError as e:
+                    self.logger.error(f"Failed to write clip {file_name} to disk: {str(e)}")
+
+            if time.monotonic() - self.last_sweep >= self.sweep_interval:
+                self.last_sweep = time.monotonic()
+                self._sweep()
+
+    def _sweep(self):
+        # The directory is shared with other audio (e.g. the greeting), only specialist clips are swept
+        deleted, retained_bytes = sweep_directory(self.write_behind_directory, "-specialist.wav", self.retention_seconds, self.quota_bytes, self.logger)
+        if deleted:
+            self.logger.info(f"Write-behind sweep deleted {deleted} clips, {retained_bytes / (1024 * 1024):.1f}MB retained")
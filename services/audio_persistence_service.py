@@ -1,33 +1,77 @@
+import asyncio
+import io
 import logging
 import os
+import time
+from typing import Optional
 
+import numpy as np
 import soundfile as sf
 
 from schemas.conversation_segment import ConversationSegment
+from services.audio_archive_writer import AudioArchiveWriter
+from services.audio_clip_store import AudioClipStore
 from utilities.logging_utils import configure_logger
 
 
 class AudioPersistenceService:
-    def __init__(self):
+    def __init__(self, clip_store: Optional[AudioClipStore] = None, archive_writer: Optional[AudioArchiveWriter] = None):
         self.logger = configure_logger('audio_persistence_service_logger', logging.INFO)
         self.logger.info("Audio persistence service initializing...")
-        self.call_id_counters = {}
         self.audio_storage_directory = os.getenv('AUDIO_CLIP_DIR')
+
+        # Clips are served from memory, disk is an optional write-behind tier
+        self.clip_store = clip_store or AudioClipStore(
+            memory_budget_bytes=int(float(os.getenv('AUDIO_CLIP_STORE_MB', '256')) * 1024 * 1024),
+            clip_ttl=float(os.getenv('AUDIO_CLIP_TTL_SECONDS', '600')),
+            write_behind_directory=self.audio_storage_directory if os.getenv('AUDIO_CLIP_WRITE_BEHIND', 'false').lower() == 'true' else None,
+            max_queued_clips=int(os.getenv('AUDIO_CLIP_WRITE_BEHIND_MAX_QUEUED_CLIPS', '200')),
+            retention_seconds=float(os.getenv('AUDIO_CLIP_WRITE_BEHIND_RETENTION_HOURS', '24')) * 3600,
+            quota_bytes=int(float(os.getenv('AUDIO_CLIP_WRITE_BEHIND_QUOTA_MB', '1024')) * 1024 * 1024)
+        )
+
+        # Specialist audio is archived off the request path in a compact format, AUDIO_ARCHIVE_FORMAT=none disables it
+        archive_format = os.getenv('AUDIO_ARCHIVE_FORMAT', 'ulaw').lower()
+        self.archive_writer = archive_writer
+        if self.archive_writer is None and archive_format != 'none' and self.audio_storage_directory:
+            self.archive_writer = AudioArchiveWriter(
+                archive_directory=os.getenv('AUDIO_ARCHIVE_DIR', os.path.join(self.audio_storage_directory, 'archive')),
+                archive_format=archive_format,
+                max_queued_clips=int(os.getenv('AUDIO_ARCHIVE_MAX_QUEUED_CLIPS', '200')),
+                retention_seconds=float(os.getenv('AUDIO_ARCHIVE_RETENTION_DAYS', '30')) * 24 * 3600,
+                quota_bytes=int(float(os.getenv('AUDIO_ARCHIVE_QUOTA_MB', '1024')) * 1024 * 1024)
+            )
         self.logger.info("Audio persistence service initialized")
 
 
-    def write_wav_file(self, conversation_segment: ConversationSegment):
+    async def write_wav_file(self, conversation_segment: ConversationSegment):
 
-        call_id = conversation_segment.call_id
-        if call_id not in self.call_id_counters:
-            self.call_id_counters[call_id] = 0
-        else:
-            self.call_id_counters[call_id] += 1
+        clip_name = self.clip_name(conversation_segment.call_id)
+        file_name = f"{clip_name}.wav"
 
-        file_name = f"{call_id}-{self.call_id_counters[call_id]}-specialist.wav"
+        # Encode the WAV in memory off the event loop and hand it to the clip store for /twilio-play
+        wav_data = await asyncio.to_thread(self.encode_wav, conversation_segment.specialist_audio_data)
+        self.clip_store.put(file_name, wav_data)
 
-        sf.write(f"{self.audio_storage_directory}/{file_name}", conversation_segment.specialist_audio_data, 24000, format='WAV', subtype='PCM_16')
+        self.archive_audio(clip_name, conversation_segment.specialist_audio_data)
 
         conversation_segment.specialist_audio_file = file_name
 
-        self.logger.info(f"Audio file written to disk: {conversation_segment.specialist_audio_file}")
+        self.logger.info(f"Audio clip stored: {conversation_segment.specialist_audio_file}")
+
+
+    @staticmethod
+    def clip_name(call_id: str) -> str:
+        # Clips are named by creation time, unique per call without per-call state to outlive the call's writes
+        return f"{call_id}-{time.time_ns()}-specialist"
+
+    def archive_audio(self, clip_name: str, audio_data: np.ndarray):
+        """Archive specialist audio that is not served as a clip (e.g. streamed over the media stream)."""
+        if self.archive_writer is not None:
+            self.archive_writer.archive(clip_name, audio_data)
+
+    @staticmethod
+    def encode_wav(audio_data) -> bytes:
+        wav_buffer = io.BytesIO()
+        sf.write(wav_buffer, audio_data, 24000, format='WAV', subtype='PCM_16')
+        return wav_buffer.getvalue()
@@ -0,0 +1,20 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from schemas.call_state import CallState
+
+
+class CallStateStore(ABC):
+    """Persists the agent state of each call between checkpoints, one record per call."""
+
+    @abstractmethod
+    def get(self, call_id: str) -> Optional[CallState]:
+        pass
+
+    @abstractmethod
+    def put(self, call_state: CallState):
+        pass
+
+    @abstractmethod
+    def delete(self, call_id: str):
+        pass
@@ -0,0 +1,25 @@
+import os
+from typing import Optional
+
+from services.call_state.call_state_store import CallStateStore
+from services.call_state.in_memory_call_state_store import InMemoryCallStateStore
+from services.call_state.sqlite_call_state_store import SqliteCallStateStore
+
+
+def create_call_state_store(store_name: Optional[str] = None) -> CallStateStore:
+    """Create the call state store selected by CALL_STATE_STORE unless a name is given."""
+    store_name = (store_name or os.getenv("CALL_STATE_STORE", "memory")).lower()
+
+    if store_name == "sqlite":
+        return SqliteCallStateStore(
+            database_path=os.getenv("CALL_STATE_DB_PATH", "call_state.db"),
+            state_ttl=float(os.getenv("CALL_STATE_TTL_SECONDS", str(24 * 3600)))
+        )
+
+    if store_name != "memory":
+        raise ValueError(f"Unknown call state store: {store_name}")
+
+    return InMemoryCallStateStore(
+        max_calls=int(os.getenv("CALL_STATE_MAX_CALLS", "1000")),
+        state_ttl=float(os.getenv("CALL_STATE_TTL_SECONDS", "3600"))
+    )
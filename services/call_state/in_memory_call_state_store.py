@@ -0,0 +1,56 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from schemas.call_state import CallState
+from services.call_state.call_state_store import CallStateStore
+from utilities.logging_utils import configure_logger
+
+
+class InMemoryCallStateStore(CallStateStore):
+    """
+    Keeps call state in process memory, bounded by a call cap (least recently used calls are dropped
+    first) and a TTL so memory stays flat however many calls the process handles.
+    """
+
+    def __init__(self,
+                 max_calls: int = 1000,
+                 state_ttl: float = 3600.0):  # Seconds since the last write before a call's state is dropped
+        self.logger = configure_logger('in_memory_call_state_store_logger', logging.INFO)
+        self.max_calls = max_calls
+        self.state_ttl = state_ttl
+
+        self.call_states: OrderedDict[str, Tuple[CallState, float]] = OrderedDict()  # Call id -> (state, expiry)
+        self.lock = threading.Lock()
+
+    def get(self, call_id: str) -> Optional[CallState]:
+        with self.lock:
+            entry = self.call_states.get(call_id)
+            if entry is None:
+                return None
+            call_state, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self.call_states[call_id]
+                return None
+            self.call_states.move_to_end(call_id)
+            return call_state.model_copy(deep=True)
+
+    def put(self, call_state: CallState):
+        with self.lock:
+            now = time.monotonic()
+            self.call_states.pop(call_state.call_id, None)
+            self.call_states[call_state.call_id] = (call_state.model_copy(deep=True), now + self.state_ttl)
+            self._evict(now)
+
+    def delete(self, call_id: str):
+        with self.lock:
+            self.call_states.pop(call_id, None)
+
+    def _evict(self, now: float):
+        for call_id in [call_id for call_id, (_, expires_at) in self.call_states.items() if expires_at <= now]:
+            del self.call_states[call_id]
+        while len(self.call_states) > self.max_calls:
+            call_id, _ = self.call_states.popitem(last=False)
+            self.logger.info(f"Dropped state of least recently used call {call_id}")
@@ -0,0 +1,67 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Optional
+
+from schemas.call_state import CallState
+from services.call_state.call_state_store import CallStateStore
+from utilities.logging_utils import configure_logger
+
+
+class SqliteCallStateStore(CallStateStore):
+    """
+    Keeps call state in a local SQLite database (WAL mode) so several worker processes can share it and
+    it survives restarts. Each call is one row holding its state as zlib compressed JSON. Rows not written
+    for longer than the TTL are purged periodically.
+    """
+
+    def __init__(self,
+                 database_path: str,
+                 state_ttl: float = 24 * 3600.0,  # Seconds since the last write before a call's row is purged
+                 purge_interval: float = 600.0):
+        self.logger = configure_logger('sqlite_call_state_store_logger', logging.INFO)
+        self.database_path = database_path
+        self.state_ttl = state_ttl
+        self.purge_interval = purge_interval
+        self.last_purge = 0.0
+
+        # One connection shared by the event loop and worker threads, serialized by the lock
+        self.connection = sqlite3.connect(database_path, check_same_thread=False, isolation_level=None, timeout=5.0)
+        self.lock = threading.Lock()
+        with self.lock:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            self.connection.execute("""
+                CREATE TABLE IF NOT EXISTS call_state (
+                    call_id TEXT PRIMARY KEY,
+                    state BLOB NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            self.connection.execute("CREATE INDEX IF NOT EXISTS call_state_updated_at ON call_state (updated_at)")
+
+    def get(self, call_id: str) -> Optional[CallState]:
+        with self.lock:
+            row = self.connection.execute("SELECT state, updated_at FROM call_state WHERE call_id = ?", (call_id,)).fetchone()
+        if row is None or row[1] <= time.time() - self.state_ttl:
+            return None
+        return CallState.model_validate(json.loads(zlib.decompress(row[0])))
+
+    def put(self, call_state: CallState):
+        state = zlib.compress(json.dumps(call_state.model_dump(mode='json', exclude_none=True), separators=(',', ':')).encode('utf-8'))
+        now = time.time()
+        with self.lock:
+            self.connection.execute("INSERT OR REPLACE INTO call_state (call_id, state, updated_at) VALUES (?, ?, ?)",
+                                    (call_state.call_id, state, now))
+            if now - self.last_purge >= self.purge_interval:
+                self.last_purge = now
+                purged = self.connection.execute("DELETE FROM call_state WHERE updated_at <= ?", (now - self.state_ttl,)).rowcount
+                if purged:
+                    self.logger.info(f"Purged state of {purged} expired calls")
+
+    def delete(self, call_id: str):
+        with self.lock:
+            self.connection.execute("DELETE FROM call_state WHERE call_id = ?", (call_id,))
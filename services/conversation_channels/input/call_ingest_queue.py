@@ -0,0 +1,100 @@
+import asyncio
+import base64
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+from utilities.logging_utils import configure_logger
+
+
+class CallIngestQueue:
+    """
+    Feeds the media frames of one call to a single ordered consumer through a bounded queue.
+
+    Frames are aggregated into blocks of frames_per_block (flushed early after max_block_wait) so
+    the downstream stages run a few times per second instead of once per 20ms frame. When the queue
+    is full the overflow policy drops either the oldest ("drop_oldest") or the incoming frame
+    ("drop_newest"). Frames that waited longer than late_threshold in the queue are counted as late.
+    """
+
+    def __init__(self,
+                 call_id: str,
+                 process_block: Callable[[str], Awaitable[None]],  # Receives the base64 payload of an aggregated block
+                 max_queued_frames: int = 250,
+                 frames_per_block: int = 5,
+                 max_block_wait: float = 0.2,  # Seconds to wait for a block to fill before flushing it
+                 overflow_policy: str = "drop_oldest",
+                 late_threshold: float = 0.5):  # Seconds a frame may wait in the queue before it counts as late
+        self.logger = configure_logger('call_ingest_queue_logger', logging.INFO)
+        self.call_id = call_id
+        self.process_block = process_block
+        self.frames_per_block = frames_per_block
+        self.max_block_wait = max_block_wait
+        self.overflow_policy = overflow_policy
+        self.late_threshold = late_threshold
+
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queued_frames)
+        self.consumer_task: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.frames_received = 0
+        self.frames_dropped = 0
+        self.frames_late = 0
+        self.blocks_processed = 0
+
+    def start(self):
+        self.consumer_task = asyncio.create_task(self._consume())
+
+    def put_frame(self, payload: str):
+        """Queue a base64 media payload without blocking the websocket receive loop."""
+        self.frames_received += 1
+        if self.queue.full():
+            self.frames_dropped += 1
+            if self.overflow_policy == "drop_newest":
+                return
+            self.queue.get_nowait()
+        self.queue.put_nowait((payload, time.monotonic()))
+
+    async def close(self):
+        """Stop the consumer and log the call's ingest metrics."""
+        if self.consumer_task is not None:
+            self.consumer_task.cancel()
+            try:
+                await self.consumer_task
+            except asyncio.CancelledError:
+                pass
+        self.logger.info(f"Ingest metrics for call {self.call_id}: {self.metrics()}")
+
+    def metrics(self) -> Dict[str, int]:
+        return {
+            "frames_received": self.frames_received,
+            "frames_dropped": self.frames_dropped,
+            "frames_late": self.frames_late,
+            "blocks_processed": self.blocks_processed,
+            "queue_depth": self.queue.qsize()
+        }
+
+    async def _next_block(self) -> bytes:
+        frames = [await self.queue.get()]
+        deadline = time.monotonic() + self.max_block_wait
+        while len(frames) < self.frames_per_block:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                frames.append(await asyncio.wait_for(self.queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+
+        now = time.monotonic()
+        self.frames_late += sum(1 for _, enqueued_at in frames if now - enqueued_at > self.late_threshold)
+        return b"".join(base64.b64decode(payload) for payload, _ in frames)
+
+    async def _consume(self):
+        while True:
+            block = await self._next_block()
+            try:
+                await self.process_block(base64.b64encode(block).decode('utf-8'))
+                self.blocks_processed += 1
+            except Exception as e:
+                self.logger.error(f"Error processing audio block for call {self.call_id}: {str(e)}")
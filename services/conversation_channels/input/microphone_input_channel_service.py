@@ -1,5 +1,4 @@
 import asyncio
-import audioop
 import base64
 import logging
 import threading
@@ -14,6 +13,7 @@ from schemas.conversation_input_channel_type import ConversationInputChannelType
 from schemas.conversation_output_channel_type import ConversationOutputChannelType
 from schemas.conversation_segment import ConversationSegment
 from services.conversation_segment_processor_service import ConversationSegmentProcessorService
+from utilities.audio_codec import ulaw_encode
 from utilities.logging_utils import configure_logger
 
 
@@ -49,13 +49,8 @@ class MicrophoneInputChannelService:
 
         if self.stream_initialized:
             try:
-                # Prevent overflow and convert to int16 PCM
-                indata = np.clip(indata, -1.0, 1.0)
-                audio_pcm = (indata.flatten() * 32767).astype(np.int16)
-                audio_bytes = audio_pcm.tobytes()
-
-                # Convert to u-law (2 bytes per sample)
-                audio_ulaw = audioop.lin2ulaw(audio_bytes, 2)
+                # Convert float32 samples straight to u-law (clipping is handled by the encoder)
+                audio_ulaw = ulaw_encode(indata.reshape(-1)).tobytes()
 
                 # Encode to base64
                 encoded = base64.b64encode(audio_ulaw).decode('utf-8')
@@ -1,23 +1,29 @@
-import asyncio
 import json
 import logging
 import os
 import time
+from functools import partial
 
 from fastapi import FastAPI, WebSocket, Request, Response, Query, HTTPException
 from fastapi.responses import FileResponse
 from starlette.websockets import WebSocketDisconnect
-from twilio.twiml.voice_response import VoiceResponse, Start
+from twilio.twiml.voice_response import VoiceResponse, Start, Connect
 
+from clients.llm_client_pool import get_llm_client_pool
+from clients.model_cascade_client import get_model_usage_ledger
 from schemas.audio_data import AudioData
 from schemas.conversation_input_channel_type import ConversationInputChannelType
 from schemas.conversation_output_channel_type import ConversationOutputChannelType
 from schemas.conversation_segment import ConversationSegment
+from services.conversation_channels.input.call_ingest_queue import CallIngestQueue
 from services.conversation_segment_processor_service import ConversationSegmentProcessorService
 from utilities.fastapi_utils import log_request
 from utilities.logging_utils import configure_logger
 
 logger = configure_logger('twilio_input_channel_service_logger', logging.INFO)
+
+# "media_stream" plays specialist audio back over the /ws websocket, "rest" uses <Play> updates via the REST API
+TWILIO_AUDIO_OUTPUT = os.getenv("TWILIO_AUDIO_OUTPUT", "rest").lower()
 conversation_segment_processor_service = ConversationSegmentProcessorService()
 
 app = FastAPI()
@@ -27,9 +33,10 @@ async def answer_call(request: Request):
     logger.info("Answering call...")
     await log_request(request)
     response = VoiceResponse()
-    start = Start()
-    start.stream(url=f"wss://{os.getenv('NGROK_DOMAIN')}/ws", name="MyAudioStream")
-    response.append(start)
+    if TWILIO_AUDIO_OUTPUT != "media_stream":
+        start = Start()
+        start.stream(url=f"wss://{os.getenv('NGROK_DOMAIN')}/ws", name="MyAudioStream")
+        response.append(start)
 
     # Check if pre-recorded greeting in the specified voice exists, if so use it, otherwise use twilio tts to say the greeting
     prerecorded_greeting_file_name="chase-greeting-" + os.getenv('TTS_VOICE') + ".wav"
@@ -38,6 +45,13 @@ async def answer_call(request: Request):
     else:
         response.say("Thank you for calling Chase. How can I help you today?")
 
+    # A bidirectional stream must be connected, which holds the call until the websocket closes
+    if TWILIO_AUDIO_OUTPUT == "media_stream":
+        connect = Connect()
+        connect.stream(url=f"wss://{os.getenv('NGROK_DOMAIN')}/ws", name="MyAudioStream")
+        response.append(connect)
+        return Response(content=str(response), media_type="application/xml")
+
     response.redirect(url="/call-keepalive", method="POST")
     return Response(content=str(response), media_type="application/xml")
 
@@ -54,6 +68,7 @@ async def handle_audio_stream(websocket: WebSocket):
     await websocket.accept()
     stream_initialized = False
     call_sid = None
+    ingest_queue = None
     last_activity = time.time()
     try:
         while True:
@@ -70,19 +85,32 @@ async def handle_audio_stream(websocket: WebSocket):
                     logger.info("Media stream started: %s", message["start"])
                     call_sid = message["start"].get("callSid")
                     stream_initialized = True
+
+                    # Specialist audio for this call is sent back over this websocket
+                    if TWILIO_AUDIO_OUTPUT == "media_stream":
+                        conversation_segment_processor_service.media_stream_output_channel.register_stream(call_sid, message["start"].get("streamSid"), websocket)
+
+                    # One ordered consumer per call, frames are aggregated into blocks before transcription
+                    ingest_queue = CallIngestQueue(
+                        call_sid,
+                        partial(process_audio_block, call_sid),
+                        max_queued_frames=int(os.getenv("INGEST_MAX_QUEUED_FRAMES", "250")),
+                        frames_per_block=int(os.getenv("INGEST_FRAMES_PER_BLOCK", "5")),
+                        overflow_policy=os.getenv("INGEST_OVERFLOW_POLICY", "drop_oldest").lower()
+                    )
+                    ingest_queue.start()
                     continue
 
                 if message.get("event") == "media" and stream_initialized:
+                    ingest_queue.put_frame(message["media"]["payload"])
 
-                    # Instantiate a ConversationSegment object
-                    conversation_segment = ConversationSegment(
-                        call_id=call_sid,
-                        input_audio_channel=ConversationInputChannelType.TWILIO,
-                        customer_audio=AudioData(raw_audio=message["media"]["payload"], format="ULAW", frequency=8000, channels=1, bit_depth=16),
-                        output_audio_channel=ConversationOutputChannelType.TWILIO
-                    )
+                if message.get("event") == "mark" and stream_initialized:
+                    conversation_segment_processor_service.media_stream_output_channel.handle_mark(call_sid, message["mark"].get("name"))
+                    continue
 
-                    asyncio.create_task(conversation_segment_processor_service.process_conversation_segment(conversation_segment))
+                if message.get("event") == "stop":
+                    logger.info("Media stream stopped for call %s", call_sid)
+                    break
 
                 # Close if inactive for 300 seconds
                 if time.time() - last_activity > 300:
@@ -99,6 +127,11 @@ async def handle_audio_stream(websocket: WebSocket):
     except Exception as e:
         logger.exception("WebSocket error:")
     finally:
+        if ingest_queue is not None:
+            await ingest_queue.close()
+        if call_sid is not None:
+            conversation_segment_processor_service.media_stream_output_channel.unregister_stream(call_sid)
+            await conversation_segment_processor_service.end_call(call_sid)
         try:
             await websocket.close()
             logger.info("WebSocket connection closed")
@@ -106,11 +139,42 @@ async def handle_audio_stream(websocket: WebSocket):
             pass
 
 
+async def process_audio_block(call_sid: str, payload: str):
+
+    # Instantiate a ConversationSegment object
+    conversation_segment = ConversationSegment(
+        call_id=call_sid,
+        input_audio_channel=ConversationInputChannelType.TWILIO,
+        customer_audio=AudioData(raw_audio=payload, format="ULAW", frequency=8000, channels=1, bit_depth=16),
+        output_audio_channel=ConversationOutputChannelType.TWILIO_MEDIA_STREAM if TWILIO_AUDIO_OUTPUT == "media_stream" else ConversationOutputChannelType.TWILIO
+    )
+
+    await conversation_segment_processor_service.process_conversation_segment(conversation_segment)
+
+
+@app.get("/llm-metrics")
+async def llm_metrics():
+    """Concurrency, queue wait and service time of each LLM backend."""
+    return get_llm_client_pool().metrics()
+
+
+@app.get("/llm-usage")
+async def llm_usage():
+    """Tokens and latency of each live call's model requests, by model."""
+    return get_model_usage_ledger().metrics()
+
+
 @app.get("/twilio-play")
 async def twilio_play(filename: str = Query(..., description="Name of the .wav file")):
     # Use os.path.basename to avoid directory traversal vulnerabilities
     safe_filename = os.path.basename(filename)
 
+    # Recently generated clips are served straight from memory, the bytes are passed through without a copy
+    clip = conversation_segment_processor_service.audio_persistence_service.clip_store.get(safe_filename)
+    if clip is not None:
+        return Response(content=clip, media_type="audio/wav")
+
+    # Fall back to disk for pre-recorded audio (e.g. the greeting) and written-behind clips
     file_path = os.path.join(os.getenv('AUDIO_CLIP_DIR'), f"{safe_filename}")
 
     if not os.path.isfile(file_path):
@@ -0,0 +1,103 @@
+import asyncio
+import base64
+import itertools
+import json
+import logging
+from typing import Dict, List
+
+from fastapi import WebSocket
+
+from schemas.conversation_segment import ConversationSegment
+from utilities.audio_codec import StreamingResampler, ulaw_encode
+from utilities.logging_utils import configure_logger
+
+
+class TwilioMediaStream:
+    """State of one call's bidirectional media stream."""
+
+    def __init__(self, stream_sid: str, websocket: WebSocket, input_sample_rate: int):
+        self.stream_sid = stream_sid
+        self.websocket = websocket
+        self.resampler = StreamingResampler(input_sample_rate, 8000)
+        self.pending_marks: List[str] = []  # Marks sent but not yet echoed back, i.e. audio still queued or playing
+        self.send_lock = asyncio.Lock()
+
+
+class TwilioMediaStreamOutputChannelService:
+    """
+    Plays specialist audio by sending 8kHz u-law media frames back over the call's /ws media stream.
+
+    Each published clip is followed by a mark event; Twilio echoes the mark once the clip has played,
+    which tells us whether the specialist is still speaking. A clear event flushes audio Twilio has
+    buffered but not yet played, for barge-in.
+    """
+
+    frame_size = 160  # 20ms of 8kHz u-law
+
+    def __init__(self, input_sample_rate: int = 24000):
+        self.logger = configure_logger('twilio_media_stream_output_channel_service_logger', logging.INFO)
+        self.logger.info("Twilio media stream output channel service initializing...")
+        self.input_sample_rate = input_sample_rate
+        self.streams: Dict[str, TwilioMediaStream] = {}
+        self.mark_sequence = itertools.count()
+        self.logger.info("Twilio media stream output channel service initialized")
+
+
+    def register_stream(self, call_id: str, stream_sid: str, websocket: WebSocket):
+        self.streams[call_id] = TwilioMediaStream(stream_sid, websocket, self.input_sample_rate)
+
+    def unregister_stream(self, call_id: str):
+        self.streams.pop(call_id, None)
+
+    def handle_mark(self, call_id: str, mark_name: str):
+        """Record that Twilio finished playing audio up to the given mark."""
+        stream = self.streams.get(call_id)
+        if stream is not None and mark_name in stream.pending_marks:
+            del stream.pending_marks[:stream.pending_marks.index(mark_name) + 1]
+
+    def is_playing(self, call_id: str) -> bool:
+        stream = self.streams.get(call_id)
+        return stream is not None and len(stream.pending_marks) > 0
+
+
+    async def publish_audio(self, conversation_segment: ConversationSegment):
+        """Send the segment's specialist audio as media frames followed by a mark."""
+        stream = self.streams.get(conversation_segment.call_id)
+        if stream is None:
+            self.logger.warning(f"No media stream registered for call {conversation_segment.call_id}")
+            return
+
+        ulaw_audio = ulaw_encode(stream.resampler.process(conversation_segment.specialist_audio_data)).tobytes()
+        mark_name = f"{conversation_segment.call_id}-{next(self.mark_sequence)}"
+
+        async with stream.send_lock:
+            # Pending from the first frame, so a barge-in while frames are still being sent clears them too
+            stream.pending_marks.append(mark_name)
+            for offset in range(0, len(ulaw_audio), self.frame_size):
+                await stream.websocket.send_text(json.dumps({
+                    "event": "media",
+                    "streamSid": stream.stream_sid,
+                    "media": {"payload": base64.b64encode(ulaw_audio[offset:offset + self.frame_size]).decode('utf-8')}
+                }))
+
+            await stream.websocket.send_text(json.dumps({
+                "event": "mark",
+                "streamSid": stream.stream_sid,
+                "mark": {"name": mark_name}
+            }))
+
+        self.logger.info(f"Sent {len(ulaw_audio) / 8000:.2f}s of audio to call {conversation_segment.call_id} (mark {mark_name})")
+
+
+    async def clear(self, call_id: str):
+        """Stop the specialist audio that is queued or playing on the call (barge-in)."""
+        stream = self.streams.get(call_id)
+        if stream is None or not stream.pending_marks:
+            return
+
+        async with stream.send_lock:
+            await stream.websocket.send_text(json.dumps({"event": "clear", "streamSid": stream.stream_sid}))
+            stream.pending_marks.clear()
+            stream.resampler.reset()
+
+        self.logger.info(f"Cleared specialist audio on call {call_id}")
@@ -13,6 +13,6 @@ class TwilioOutputChannelService:
         self.logger.info("Twilio output channel service initialized")
 
 
-    def publish_audio(self, conversation_segment: ConversationSegment):
+    async def publish_audio(self, conversation_segment: ConversationSegment):
         """Publish audio to Twilio."""
-        publish_audio_to_call(conversation_segment.call_id, "https://" + os.getenv('NGROK_DOMAIN') + "/twilio-play?filename=" + conversation_segment.specialist_audio_file)
+        await publish_audio_to_call(conversation_segment.call_id, "https://" + os.getenv('NGROK_DOMAIN') + "/twilio-play?filename=" + conversation_segment.specialist_audio_file)
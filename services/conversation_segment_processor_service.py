@@ -1,15 +1,22 @@
+import asyncio
 import logging
 import os
-from typing import Optional
+from functools import partial
+from typing import AsyncIterator, Dict, Optional, Set, Tuple
+
+import numpy as np
+from autogen_core import CancellationToken
 
 from clients.twilio_rest_client import interrupt_specialist_audio
 from schemas.conversation_output_channel_type import ConversationOutputChannelType
 from schemas.conversation_segment import ConversationSegment
 from services.audio_persistence_service import AudioPersistenceService
 from services.conversation_channels.output.console_output_channel_service import ConsoleOutputChannelService
+from services.conversation_channels.output.twilio_media_stream_output_channel_service import TwilioMediaStreamOutputChannelService
 from services.conversation_channels.output.twilio_output_channel_service import TwilioOutputChannelService
 from services.transcription.transcription_gateway import TranscriptionGateway
-from services.tts.kokoro_tts_service import KokoroTtsService
+from services.transcription.transcription_worker_pool import TranscriptionWorkerPool
+from services.tts.tts_worker_pool import TtsWorkerPool
 from utilities.logging_utils import configure_logger
 
 
@@ -22,22 +29,30 @@ class ConversationSegmentProcessorService:
     def __init__(
             self,
             transcription_gateway: Optional[TranscriptionGateway] = TranscriptionGateway(),
-            tts_service: Optional[KokoroTtsService] = KokoroTtsService(),
+            tts_worker_pool: Optional[TtsWorkerPool] = TtsWorkerPool(),
             audio_persistence_service: Optional[AudioPersistenceService] = AudioPersistenceService(),
             logger: Optional[logging.Logger] = configure_logger('conversation_segment_processor_service_logger', logging.INFO)
     ):
 
         self.transcription_gateway = transcription_gateway or TranscriptionGateway()
-        self.tts_service = tts_service or KokoroTtsService()
+        self.transcription_worker_pool = TranscriptionWorkerPool(
+            self.transcription_gateway,
+            max_workers=int(os.getenv("TRANSCRIPTION_WORKERS", "4")),
+            max_queued_per_call=int(os.getenv("TRANSCRIPTION_MAX_QUEUED_PER_CALL", "100"))
+        )
+        self.tts_worker_pool = tts_worker_pool or TtsWorkerPool()
         self.audio_persistence_service = audio_persistence_service or AudioPersistenceService()
         self.audio_output_channel = TwilioOutputChannelService() # TODO Consider adding gateway to drive off of convo segment output channel type
         self.console_output_channel = ConsoleOutputChannelService()
+        self.media_stream_output_channel = TwilioMediaStreamOutputChannelService(input_sample_rate=self.tts_worker_pool.sample_rate)
 
         if os.environ.get('AGENT_TYPE') == 'simple':
             from services.agents.agentic_service import AgenticService
         else:
             from services.agents.agentic_service_complex_team import AgenticService
         self.agentic_service = AgenticService()
+        self.response_tasks: Set[asyncio.Task] = set()
+        self.in_flight_responses: Dict[str, Tuple[asyncio.Task, CancellationToken]] = {}  # Call id -> current turn
 
         self.logger = logger
 
@@ -45,30 +60,160 @@ class ConversationSegmentProcessorService:
 
         # TODO convert audio format if needed
 
-        # Transcribe audio
-        conversation_segment.customer_text = self.transcription_gateway.transcribe(conversation_segment.customer_audio.raw_audio)
+        # Transcribe audio on the worker pool so inference never blocks the event loop
+        transcription_result = await self.transcription_worker_pool.transcribe(conversation_segment.call_id, conversation_segment.customer_audio.raw_audio)
 
         # Guard clause: exit if no transcript was produced
-        if not conversation_segment.customer_text:
+        if transcription_result is None or not transcription_result.text:
+            return
+
+        conversation_segment.customer_text = transcription_result.text
+        conversation_segment.is_partial_transcript = not transcription_result.is_final
+
+        # Partial transcripts are a preview of the turn, only a final transcript generates a response
+        if conversation_segment.is_partial_transcript:
             return
 
+        # The customer spoke again, nobody will hear the reply still being generated for their previous turn
+        self.cancel_specialist_response(conversation_segment.call_id)
+
+        # Respond in a separate task so the call's ingest consumer keeps transcribing in the meantime
+        cancellation_token = CancellationToken()
+        response_task = asyncio.create_task(self.process_specialist_response(conversation_segment, cancellation_token))
+        self.in_flight_responses[conversation_segment.call_id] = (response_task, cancellation_token)
+        response_task.add_done_callback(partial(self._response_done, conversation_segment.call_id))
+
+    def cancel_specialist_response(self, call_id: str):
+        """
+        Cancel the call's in-flight turn wherever it is: the LLM request, queued TTS sentences, persistence
+        and publishing. The token aborts the model request first so the team is released right away.
+        """
+        in_flight_response = self.in_flight_responses.pop(call_id, None)
+        if in_flight_response is None:
+            return
+
+        response_task, cancellation_token = in_flight_response
+        cancellation_token.cancel()
+        response_task.cancel()
+        self.logger.info(f"Cancelled in-flight specialist response for call {call_id}")
+
+    def _response_done(self, call_id: str, response_task: asyncio.Task):
+        if self.in_flight_responses.get(call_id, (None,))[0] is response_task:
+            del self.in_flight_responses[call_id]
+
+        if not response_task.cancelled() and response_task.exception() is not None:
+            self.logger.error(f"Specialist response for call {call_id} failed", exc_info=response_task.exception())
+
+    async def process_specialist_response(self, conversation_segment: ConversationSegment, cancellation_token: Optional[CancellationToken] = None):
+
         # If using twilio as audio output interrupt the specialist of they're currently speaking
+        # The REST interrupt is not awaited, it is coalesced with the play that follows if that comes soon enough
         if conversation_segment.output_audio_channel == ConversationOutputChannelType.TWILIO:
-            interrupt_specialist_audio(conversation_segment.call_id)
-
-        # Call AutoGen to generate specialist response text
-        conversation_segment.specialist_text = await self.agentic_service.process_async(conversation_segment.customer_text, conversation_segment.call_id)
+            interrupt_task = asyncio.create_task(interrupt_specialist_audio(conversation_segment.call_id))
+            self.response_tasks.add(interrupt_task)
+            interrupt_task.add_done_callback(self.response_tasks.discard)
+        elif conversation_segment.output_audio_channel == ConversationOutputChannelType.TWILIO_MEDIA_STREAM:
+            await self.media_stream_output_channel.clear(conversation_segment.call_id)
+
+        # Call AutoGen to generate the specialist response, sentences are spoken as soon as the model completes them
+        specialist_sentences = self._collect_specialist_text(
+            conversation_segment,
+            self.agentic_service.process_stream(conversation_segment.customer_text, conversation_segment.call_id, cancellation_token)
+        )
 
         # If just publishing to console do so now and return without generating output audio
         if conversation_segment.output_audio_channel == ConversationOutputChannelType.CONSOLE:
+            async for _ in specialist_sentences:
+                pass
             self.console_output_channel.publish_audio(conversation_segment)
             return
 
-        # Call Kokoro for text to speech
-        conversation_segment.specialist_audio_data = self.tts_service.generate_audio_data_from_text(conversation_segment.specialist_text)
+        # Media streams queue audio on Twilio's side, so each sentence is sent as soon as it is synthesized
+        if conversation_segment.output_audio_channel == ConversationOutputChannelType.TWILIO_MEDIA_STREAM:
+            audio_chunks = []
+            try:
+                async for audio_chunk in self.tts_worker_pool.stream_sentences(specialist_sentences):
+                    conversation_segment.specialist_audio_data = audio_chunk
+                    await self.media_stream_output_channel.publish_audio(conversation_segment)
+                    audio_chunks.append(audio_chunk)
+            finally:
+                # The response is archived as one clip, as far as it was spoken when interrupted
+                if audio_chunks:
+                    self.audio_persistence_service.archive_audio(self.audio_persistence_service.clip_name(conversation_segment.call_id),
+                                                                 np.concatenate(audio_chunks))
+            return
+
+        # Call Kokoro for text to speech, publishing the first sentence while the rest is synthesized
+        await self.publish_specialist_audio_stream(conversation_segment, specialist_sentences)
+
+    @staticmethod
+    async def _collect_specialist_text(conversation_segment: ConversationSegment, specialist_sentences: AsyncIterator[str]) -> AsyncIterator[str]:
+        """Pass the sentences through, recording the response text on the segment as it grows."""
+        conversation_segment.specialist_text = ""
+        async for sentence in specialist_sentences:
+            conversation_segment.specialist_text = f"{conversation_segment.specialist_text} {sentence}".lstrip()
+            yield sentence
+
+    async def publish_specialist_audio_stream(self, conversation_segment: ConversationSegment, specialist_sentences: AsyncIterator[str]):
+        """
+        Synthesize the specialist response sentence by sentence and publish audio as soon as it is ready.
+        Publishing replaces whatever is playing on the call, so sentences synthesized while a clip is
+        still playing are held and published together shortly before that clip ends.
+        """
+        loop = asyncio.get_running_loop()
+        audio_stream = self.tts_worker_pool.stream_sentences(specialist_sentences)
+        pending_chunks = []
+        playback_ends_at = 0.0
+        publish_lead_time = float(os.getenv("TTS_PUBLISH_LEAD_TIME_SECONDS", "0.3"))  # Covers the Twilio update round trip
+
+        # Synthesis runs on the TTS worker pool, off the event loop
+        next_chunk = asyncio.ensure_future(anext(audio_stream, None))
+        try:
+            while True:
+                timeout = max(0.0, playback_ends_at - publish_lead_time - loop.time()) if pending_chunks else None
+                done, _ = await asyncio.wait({next_chunk}, timeout=timeout)
+
+                # The current clip is about to finish, publish what has been synthesized so far
+                if not done:
+                    playback_ends_at = await self._publish_audio_chunks(conversation_segment, pending_chunks)
+                    pending_chunks = []
+                    continue
+
+                chunk = next_chunk.result()
+                if chunk is None:
+                    break
+                pending_chunks.append(chunk)
+                next_chunk = asyncio.ensure_future(anext(audio_stream, None))
+
+                # Nothing is playing (e.g. the first sentence), publish immediately
+                if loop.time() >= playback_ends_at - publish_lead_time:
+                    playback_ends_at = await self._publish_audio_chunks(conversation_segment, pending_chunks)
+                    pending_chunks = []
+
+            if pending_chunks:
+                await asyncio.sleep(max(0.0, playback_ends_at - publish_lead_time - loop.time()))
+                await self._publish_audio_chunks(conversation_segment, pending_chunks)
+        finally:
+            # On cancellation (e.g. barge-in) stop the synthesis so queued sentences are dropped and worker slots freed
+            if not next_chunk.done():
+                next_chunk.cancel()
+                await asyncio.wait({next_chunk})
+            await audio_stream.aclose()
+
+    async def _publish_audio_chunks(self, conversation_segment: ConversationSegment, audio_chunks: list) -> float:
+        """Save and publish the chunks as one clip, returns the loop time at which it will finish playing."""
+        conversation_segment.specialist_audio_data = np.concatenate(audio_chunks)
 
         # Save audio to disk
-        self.audio_persistence_service.write_wav_file(conversation_segment)
+        await self.audio_persistence_service.write_wav_file(conversation_segment)
 
         # Publish audio to Twilio
-        self.audio_output_channel.publish_audio(conversation_segment)
+        await self.audio_output_channel.publish_audio(conversation_segment)
+
+        return asyncio.get_running_loop().time() + len(conversation_segment.specialist_audio_data) / self.tts_worker_pool.sample_rate
+
+    async def end_call(self, call_id: str):
+        """Release per-call resources once the call has ended."""
+        self.cancel_specialist_response(call_id)
+        self.transcription_worker_pool.end_call(call_id)
+        await self.agentic_service.end_call(call_id)
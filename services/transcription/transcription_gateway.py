@@ -1,7 +1,12 @@
 import logging
 import os
+from typing import Optional
 
+from schemas.transcription_result import TranscriptionResult
+
+from services.transcription.transcription_session_manager import TranscriptionSessionManager
 from services.transcription.vosk_transcription_service import VoskTranscriptionService
+from services.transcription.whisper_batch_scheduler import WhisperBatchScheduler
 from services.transcription.whisper_transcription_service import WhisperTranscriptionService
 from utilities.logging_utils import configure_logger
 
@@ -13,15 +18,43 @@ class TranscriptionGateway:
 
         self.transcription_service_prop = os.getenv("TRANSCRIPTION_SERVICE", "whisper").lower()
         self.transcription_model_prop = os.getenv("TRANSCRIPTION_MODEL", "large-v3-turbo").lower()
+        self.transcription_streaming_prop = os.getenv("TRANSCRIPTION_STREAMING", "false").lower() == "true"
 
+        # Model weights are loaded once and shared, each call gets its own service instance
         if self.transcription_service_prop == "whisper":
             self.logger.info(f"Using Whisper transcription service with model: {self.transcription_model_prop}")
-            self.transcription_service = WhisperTranscriptionService(model_name=self.transcription_model_prop, silence_duration=.5)
+            # Utterances from all calls are spread across parallel model contexts
+            model_contexts = [WhisperTranscriptionService.load_model(self.transcription_model_prop)
+                              for _ in range(int(os.getenv("WHISPER_MODEL_CONTEXTS", "1")))]
+            self.batch_scheduler = WhisperBatchScheduler(
+                model_contexts,
+                max_pending=int(os.getenv("WHISPER_BATCH_MAX_PENDING", "64"))
+            )
+            session_factory = lambda call_id: WhisperTranscriptionService(model_name=self.transcription_model_prop, silence_duration=.5, batch_scheduler=self.batch_scheduler, streaming=self.transcription_streaming_prop)
         else:
+            self.batch_scheduler = None
             self.logger.info(f"Using Vosk transcription service with model: {self.transcription_model_prop}")
-            self.transcription_service = VoskTranscriptionService(model_name=self.transcription_model_prop)
+            vosk_model = VoskTranscriptionService.load_model(self.transcription_model_prop)
+            session_factory = lambda call_id: VoskTranscriptionService(model_name=self.transcription_model_prop, model=vosk_model, streaming=self.transcription_streaming_prop)
+
+        self.session_manager = TranscriptionSessionManager(
+            session_factory,
+            max_sessions=int(os.getenv("TRANSCRIPTION_MAX_SESSIONS", "50")),
+            session_ttl=float(os.getenv("TRANSCRIPTION_SESSION_TTL_SECONDS", "300"))
+        )
 
         self.logger.info("Transcription gateway initialized")
 
-    def transcribe(self, input_audio_data: str) -> str:
-        return self.transcription_service.process_audio(input_audio_data)
+    def transcribe(self, call_id: str, input_audio_data: str) -> Optional[TranscriptionResult]:
+        session = self.session_manager.get_session(call_id)
+        if session is None:
+            return None  # Over the session cap
+        return session.process_audio(input_audio_data)
+
+    @property
+    def queue_depth(self) -> int:
+        """Utterances waiting for Whisper inference across all calls."""
+        return self.batch_scheduler.queue_depth if self.batch_scheduler else 0
+
+    def end_call(self, call_id: str):
+        self.session_manager.end_session(call_id)
@@ -1,11 +1,14 @@
 from abc import ABC, abstractmethod
 from typing import Optional
 
+from schemas.transcription_result import TranscriptionResult
+
 
 class TranscriptionService(ABC):
     @abstractmethod
-    def process_audio(self, input_audio_data: str) -> Optional[str]:
+    def process_audio(self, input_audio_data: str) -> Optional[TranscriptionResult]:
         """
         Process incoming audio data and return a transcription if available.
+        Streaming services may also return partial (non-final) transcriptions.
         """
         pass
@@ -0,0 +1,85 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Set
+
+from services.transcription.transcription_service import TranscriptionService
+from utilities.logging_utils import configure_logger
+
+
+class TranscriptionSessionManager:
+    """
+    Keeps one transcription service instance per call so every call owns its own audio buffer,
+    silence detection state and recognizer, while the factory shares the loaded model weights.
+    Sessions idle for longer than the TTL are evicted. Live sessions are never evicted to make room,
+    once the session cap is reached new calls are rejected (not transcribed) until a session ends or
+    expires.
+    """
+
+    def __init__(self,
+                 session_factory: Callable[[str], TranscriptionService],
+                 max_sessions: int = 50,
+                 session_ttl: float = 300.0):  # Idle time in seconds before a session is evicted
+        self.logger = configure_logger('transcription_session_manager_logger', logging.INFO)
+        self.session_factory = session_factory
+        self.max_sessions = max_sessions
+        self.session_ttl = session_ttl
+
+        # Ordered from least to most recently used
+        self.sessions: OrderedDict[str, TranscriptionService] = OrderedDict()
+        self.last_used: Dict[str, float] = {}
+        self.rejected_call_ids: Set[str] = set()  # Calls turned away at the cap, logged once each
+        self.lock = threading.Lock()
+
+    def get_session(self, call_id: str) -> Optional[TranscriptionService]:
+        """
+        Return the session for the call, creating it (and evicting idle sessions) if needed, None when the
+        call is new and the session cap is reached.
+        """
+        with self.lock:
+            now = time.monotonic()
+            self._evict_expired(now)
+
+            session = self.sessions.get(call_id)
+            if session is None:
+                if len(self.sessions) >= self.max_sessions:
+                    if call_id not in self.rejected_call_ids:
+                        self.rejected_call_ids.add(call_id)
+                        self.logger.warning(f"Session cap of {self.max_sessions} reached, not transcribing call {call_id}")
+                    return None
+
+                self.rejected_call_ids.discard(call_id)
+                session = self.session_factory(call_id)
+                self.sessions[call_id] = session
+                self.logger.info(f"Created transcription session for call {call_id} ({len(self.sessions)} active)")
+            else:
+                self.sessions.move_to_end(call_id)
+
+            self.last_used[call_id] = now
+            return session
+
+    def end_session(self, call_id: str):
+        """Release the session for a call that has ended."""
+        with self.lock:
+            if self.sessions.pop(call_id, None) is not None:
+                self.logger.info(f"Ended transcription session for call {call_id} ({len(self.sessions)} active)")
+            self.last_used.pop(call_id, None)
+            self.rejected_call_ids.discard(call_id)
+
+    def evict_expired(self):
+        with self.lock:
+            self._evict_expired(time.monotonic())
+
+    def _evict_expired(self, now: float):
+        # Sessions are ordered by last use so we can stop at the first one still within its TTL
+        while self.sessions:
+            call_id = next(iter(self.sessions))
+            if now - self.last_used[call_id] < self.session_ttl:
+                break
+            self.sessions.popitem(last=False)
+            del self.last_used[call_id]
+            self.logger.info(f"Evicted idle transcription session for call {call_id}")
+
+    def __len__(self) -> int:
+        return len(self.sessions)
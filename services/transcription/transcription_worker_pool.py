@@ -0,0 +1,86 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+from schemas.transcription_result import TranscriptionResult
+from services.transcription.transcription_gateway import TranscriptionGateway
+from utilities.logging_utils import configure_logger
+
+
+class TranscriptionWorkerPool:
+    """
+    Runs transcription on a thread pool so inference never blocks the asyncio event loop.
+
+    Each call gets its own bounded lane consumed by a single task, so audio for a call is transcribed
+    strictly in arrival order while different calls are transcribed in parallel. When a lane is full
+    the producer waits, which applies backpressure instead of growing memory without bound.
+    """
+
+    def __init__(self,
+                 transcription_gateway: TranscriptionGateway,
+                 max_workers: int = 4,
+                 max_queued_per_call: int = 100):
+        self.logger = configure_logger('transcription_worker_pool_logger', logging.INFO)
+        self.transcription_gateway = transcription_gateway
+        self.max_queued_per_call = max_queued_per_call
+
+        # whisper.cpp and Vosk release the GIL during inference so threads scale across cores. A whisper.cpp
+        # context is not thread-safe, so threads only run in parallel on separate contexts (the batch scheduler's)
+        # and take turns on a shared one, Vosk recognizers are per call and safely share the model
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='transcription-worker')
+        self.lanes: Dict[str, asyncio.Queue] = {}
+        self.lane_tasks: Dict[str, asyncio.Task] = {}
+
+        self.logger.info(f"Transcription worker pool initialized with {max_workers} workers")
+
+    async def transcribe(self, call_id: str, input_audio_data: str) -> Optional[TranscriptionResult]:
+        """Queue audio on the call's lane and wait for its transcription result."""
+        lane = self._get_lane(call_id)
+        future = asyncio.get_running_loop().create_future()
+        await lane.put((input_audio_data, future))
+        return await future
+
+    def queue_depth(self, call_id: str = None) -> int:
+        """Number of audio chunks waiting for a worker, for one call or across all calls."""
+        if call_id is not None:
+            lane = self.lanes.get(call_id)
+            return lane.qsize() if lane else 0
+        return sum(lane.qsize() for lane in self.lanes.values())
+
+    def end_call(self, call_id: str):
+        """Stop the call's lane, fail any audio still waiting on it and release its transcription session."""
+        task = self.lane_tasks.pop(call_id, None)
+        if task is not None:
+            task.cancel()
+
+        lane = self.lanes.pop(call_id, None)
+        while lane is not None and not lane.empty():
+            _, future = lane.get_nowait()
+            future.cancel()
+
+        self.transcription_gateway.end_call(call_id)
+
+    def _get_lane(self, call_id: str) -> asyncio.Queue:
+        lane = self.lanes.get(call_id)
+        if lane is None:
+            lane = asyncio.Queue(maxsize=self.max_queued_per_call)
+            self.lanes[call_id] = lane
+            self.lane_tasks[call_id] = asyncio.create_task(self._consume_lane(call_id, lane))
+        return lane
+
+    async def _consume_lane(self, call_id: str, lane: asyncio.Queue):
+        loop = asyncio.get_running_loop()
+        while True:
+            input_audio_data, future = await lane.get()
+            try:
+                result = await loop.run_in_executor(self.executor, self.transcription_gateway.transcribe, call_id, input_audio_data)
+                if not future.done():
+                    future.set_result(result)
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:
+                self.logger.error(f"Transcription error for call {call_id}: {str(e)}")
+                if not future.done():
+                    future.set_exception(e)
@@ -1,4 +1,3 @@
-import audioop
 import base64
 import json
 import logging
@@ -6,39 +5,55 @@ from typing import Optional
 
 from vosk import Model, KaldiRecognizer
 
+from schemas.transcription_result import TranscriptionResult
 from services.transcription.transcription_service import TranscriptionService
+from utilities.audio_codec import StreamingResampler, float_to_pcm16, ulaw_decode
 from utilities.logging_utils import configure_logger
 
 
 class VoskTranscriptionService(TranscriptionService):
-    def __init__(self, model_name: str):
+    def __init__(self, model_name: str,
+                 model: Optional[Model] = None,  # Shared model weights, loaded if not provided
+                 streaming: bool = False):  # Emit partial transcripts while the customer is speaking
         self.logger = configure_logger('vosk_transcription_service_logger', logging.INFO)
         self.logger.info("Vosk transcription service initializing...")
 
-        self.recognizer = KaldiRecognizer(Model(model_name), 16000) # When set to 8000 we get "Sampling frequency mismatch, expected 16000, got 8000"
+        self.recognizer = KaldiRecognizer(model or self.load_model(model_name), 16000) # When set to 8000 we get "Sampling frequency mismatch, expected 16000, got 8000"
+        self.resampler = StreamingResampler(8000, 16000)  # Per-call filter state, 8kHz u-law in
+        self.streaming = streaming
+        self.last_partial = ""
 
         self.logger.info("Vosk transcription service initialized")
 
 
-    def process_audio(self, input_audio_data: str) -> Optional[str]:
+    @staticmethod
+    def load_model(model_name: str) -> Model:
+        """Load Vosk model weights so they can be shared across per-call recognizers."""
+        return Model(model_name)
+
+
+    def process_audio(self, input_audio_data: str) -> Optional[TranscriptionResult]:
         """Process incoming audio chunks and return transcription when appropriate."""
         audio = base64.b64decode(input_audio_data)
-        pcm = audioop.ulaw2lin(audio, 2) # 8kHz u-law → 16-bit linear
-
-        # Add explicit resampling to 16kHz
-        pcm = audioop.ratecv(
-            pcm,
-            2,          # Sample width (2 bytes)
-            1,          # Channels
-            8000,       # Input rate
-            16000,      # Output rate
-            None
-        )[0]
+        samples = ulaw_decode(audio) # 8kHz u-law → float32
+
+        # Add explicit resampling to 16kHz and convert to 16-bit linear
+        pcm = float_to_pcm16(self.resampler.process(samples)).tobytes()
 
         if self.recognizer.AcceptWaveform(pcm):
             result = json.loads(self.recognizer.Result())
             text = result.get("text", "").strip()
+            self.last_partial = ""
 
             if text:
                 self.logger.info("Transcribed: %s", text)
-                return text
+                return TranscriptionResult(text=text)
+
+        # Vosk decodes incrementally, so the partial hypothesis comes without re-decoding the turn
+        elif self.streaming:
+            partial = json.loads(self.recognizer.PartialResult()).get("partial", "").strip()
+
+            if partial and partial != self.last_partial:
+                self.last_partial = partial
+                self.logger.info("Partial transcript: %s", partial)
+                return TranscriptionResult(text=partial, is_final=False)
@@ -0,0 +1,75 @@
+import logging
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List
+
+import numpy as np
+from pywhispercpp.model import Model
+
+from utilities.logging_utils import configure_logger
+
+
+class WhisperBatchScheduler:
+    """
+    Schedules utterances that are ready for transcription across call sessions onto parallel model contexts.
+
+    pywhispercpp has no multi-input decode, so there is nothing to gain from holding utterances back to batch
+    them: each utterance is dispatched, in arrival order, as soon as a context is free. Each context transcribes
+    one utterance at a time and is never shared between threads. At most max_pending utterances wait, further
+    submitters block until there is room.
+    """
+
+    def __init__(self,
+                 model_contexts: List[Model],
+                 max_pending: int = 64):
+        self.logger = configure_logger('whisper_batch_scheduler_logger', logging.INFO)
+        self.submissions_blocked = 0
+
+        self.pending: queue.Queue = queue.Queue(maxsize=max_pending)
+        self.idle_contexts: queue.Queue = queue.Queue()
+        for model_context in model_contexts:
+            self.idle_contexts.put(model_context)
+        self.executor = ThreadPoolExecutor(max_workers=len(model_contexts), thread_name_prefix='whisper-context')
+
+        self.scheduler_thread = threading.Thread(target=self._run, name='whisper-batch-scheduler', daemon=True)
+        self.scheduler_thread.start()
+
+        self.logger.info(f"Whisper batch scheduler initialized with {len(model_contexts)} model contexts and max pending {max_pending}")
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of utterances waiting for a model context."""
+        return self.pending.qsize()
+
+    def submit(self, audio: np.ndarray) -> Future:
+        future = Future()
+        try:
+            self.pending.put_nowait((audio, future))
+        except queue.Full:
+            self.submissions_blocked += 1
+            self.logger.warning(f"Whisper queue full ({self.queue_depth} pending), blocking submission "
+                                f"({self.submissions_blocked} blocked so far)")
+            self.pending.put((audio, future))
+        return future
+
+    def transcribe(self, audio: np.ndarray) -> list:
+        """Blocking transcription through the scheduler, returns the Whisper segments."""
+        return self.submit(audio).result()
+
+    def _run(self):
+        while True:
+            audio, future = self.pending.get()
+            model_context = self.idle_contexts.get()  # Waits for the next context to free
+            if not future.set_running_or_notify_cancel():
+                self.idle_contexts.put(model_context)
+                continue
+            self.executor.submit(self._transcribe_on_context, model_context, audio, future)
+
+    def _transcribe_on_context(self, model_context: Model, audio: np.ndarray, future: Future):
+        try:
+            future.set_result(model_context.transcribe(audio))
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            self.idle_contexts.put(model_context)
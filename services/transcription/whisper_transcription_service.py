@@ -1,80 +1,150 @@
-import audioop
 import base64
 import logging
-import time
-from collections import deque
+import threading
+import weakref
 from typing import Optional
 
 import numpy as np
 from pywhispercpp.model import Model
 
+from schemas.transcription_result import TranscriptionResult
 from services.transcription.transcription_service import TranscriptionService
+from services.transcription.whisper_batch_scheduler import WhisperBatchScheduler
+from services.vad.vad_detector_factory import create_vad_detector
+from services.vad.vad_engine import VadEngine
+from utilities.audio_codec import StreamingResampler, ulaw_decode
+from utilities.audio_ring_buffer import AudioRingBuffer
 from utilities.logging_utils import configure_logger
 
 
 class WhisperTranscriptionService(TranscriptionService):
+    # A whisper.cpp context is not thread-safe, calls sharing a model without a batch scheduler take turns on it
+    _model_locks: "weakref.WeakKeyDictionary[Model, threading.Lock]" = weakref.WeakKeyDictionary()
+    _model_locks_guard = threading.Lock()
+
     def __init__(self, model_name: str,
                  models_dir: str = './models/whisper',
                  silence_duration: float = 1.0,  # Duration of silence to trigger processing (in seconds)
                  sample_rate: int = 16000,
-                 max_buffer_duration: float = 30.0):  # Maximum buffer size in seconds
+                 max_buffer_duration: float = 30.0,  # Maximum buffer size in seconds
+                 whisper_model: Optional[Model] = None,  # Shared model weights, loaded if not provided
+                 batch_scheduler: Optional[WhisperBatchScheduler] = None,  # Cross-call batching, transcribes directly if not provided
+                 streaming: bool = False,  # Emit partial transcripts while the customer is speaking
+                 partial_interval: float = 1.0,  # Seconds of new audio between partial decodes
+                 max_window_duration: float = 10.0,  # Uncommitted audio kept in the decoding window (in seconds)
+                 min_speech_duration: float = 0.1,  # Speech required in a turn before it is transcribed (in seconds)
+                 vad_engine: Optional[VadEngine] = None):  # Per-call endpointing, VAD_DETECTOR selected if not provided
         self.logger = configure_logger('whisper_transcription_service_logger', logging.INFO)
-        self.whisper_model = Model(model=model_name, models_dir=models_dir)
+        self.batch_scheduler = batch_scheduler
+        self.whisper_model = whisper_model or (None if batch_scheduler else self.load_model(model_name, models_dir))
+        self.model_lock = self._model_lock(self.whisper_model) if self.whisper_model is not None else None
         self.sample_rate = sample_rate
         self.silence_duration = silence_duration
         self.max_buffer_size = int(max_buffer_duration * sample_rate)
-        self.audio_buffer = deque(maxlen=self.max_buffer_size)
-        self.silence_threshold = 0.01
+        self.audio_buffer = AudioRingBuffer(self.max_buffer_size)
+        self.decode_buffer = np.empty(0, dtype=np.float32)
+        self.resampler = StreamingResampler(8000, sample_rate)  # Per-call filter state, 8kHz u-law in
         self.last_transcription = ""
-        self.silence_start = None
 
-        # Silence check parameters
-        self.samples_since_last_check = 0
-        self.samples_per_silence_check = int(0.1 * sample_rate)  # Check silence every 100ms
+        # Endpointing counts silence in samples of received audio, independent of packet arrival times
+        self.vad_engine = vad_engine or VadEngine(create_vad_detector(), sample_rate=sample_rate, silence_duration=silence_duration)
+        self.min_speech_samples = int(min_speech_duration * sample_rate)
+
+        # Streaming parameters, audio before the committed position is already in committed_text
+        self.streaming = streaming
+        self.samples_per_partial = int(partial_interval * sample_rate)
+        self.max_window_size = int(max_window_duration * sample_rate)
+        self.samples_since_last_partial = 0
+        self.committed_text = ""
+        self.committed_position = 0  # Sample clock position of the end of the committed prefix
+        self.previous_segments = []  # Uncommitted segments of the last partial hypothesis
+        self.last_partial = ""
+
+    @staticmethod
+    def load_model(model_name: str, models_dir: str = './models/whisper') -> Model:
+        """Load Whisper model weights so they can be shared across per-call services."""
+        return Model(model=model_name, models_dir=models_dir)
+
+    @classmethod
+    def _model_lock(cls, whisper_model: Model) -> threading.Lock:
+        """The lock serializing inference on a model, shared by every service using it."""
+        with cls._model_locks_guard:
+            lock = cls._model_locks.get(whisper_model)
+            if lock is None:
+                lock = threading.Lock()
+                cls._model_locks[whisper_model] = lock
+            return lock
 
     def _convert_audio(self, input_audio_data: str) -> np.ndarray:
         """Convert incoming audio data to the format required by Whisper."""
-        # Decode base64 and convert from u-law to linear PCM
+        # Decode base64 and convert from u-law to float32 PCM in the reusable decode buffer
         audio = base64.b64decode(input_audio_data)
-        pcm = audioop.ulaw2lin(audio, 2)  # 8kHz u-law → 16-bit linear
-
-        # Resample from 8kHz to 16kHz
-        pcm = audioop.ratecv(
-            pcm,
-            2,          # Sample width (2 bytes)
-            1,          # Channels
-            8000,       # Input rate
-            16000,      # Output rate
-            None
-        )[0]
-
-        # Convert to float32 array
-        return np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
-
-    def _is_silence(self, audio_chunk: np.ndarray) -> bool:
-        """Check if an audio chunk is silence based on RMS energy."""
-        return np.sqrt(np.mean(audio_chunk**2)) < self.silence_threshold
-
-    def _should_process_buffer(self, audio_chunk: np.ndarray) -> bool:
-        """Determine if we should process the buffer based on silence detection."""
-        is_current_silence = self._is_silence(audio_chunk)
-        current_time = time.time()
-
-        # If we detect sound, reset silence timer
-        if not is_current_silence:
-            self.silence_start = None
-            return False
-
-        # If this is the start of silence, mark the time
-        if self.silence_start is None:
-            self.silence_start = current_time
-            return False
-
-        # If we've had enough silence, process the buffer
-        if current_time - self.silence_start >= self.silence_duration:
-            return True
-
-        return False
+        if len(self.decode_buffer) < len(audio):
+            self.decode_buffer = np.empty(len(audio), dtype=np.float32)
+        pcm = ulaw_decode(audio, out=self.decode_buffer)
+
+        # Resample from 8kHz to 16kHz, filter state carries over between frames
+        return self.resampler.process(pcm)
+
+    def _transcribe(self, audio_array: np.ndarray) -> list:
+        """Transcribe through the batch scheduler when one is shared across calls, else on the model under its lock."""
+        if self.batch_scheduler is not None:
+            return self.batch_scheduler.transcribe(audio_array)
+        with self.model_lock:
+            return self.whisper_model.transcribe(audio_array)
+
+    def _uncommitted_audio(self) -> np.ndarray:
+        """Zero-copy view of the buffered audio after the committed prefix (the sliding decoding window)."""
+        oldest_position = self.audio_buffer.written - len(self.audio_buffer)
+        return self.audio_buffer.view()[max(0, self.committed_position - oldest_position):]
+
+    def _commit_agreed_segments(self, segments: list) -> list:
+        """
+        Commit leading segments that match the previous hypothesis (local agreement) and slide the
+        window past them, returns the segments that remain uncommitted.
+        """
+        agreed = 0
+        for current, previous in zip(segments[:-1], self.previous_segments):
+            if current.text.strip().lower() != previous.text.strip().lower():
+                break
+            agreed += 1
+
+        # Bound decoding cost on long turns by committing everything but the last segment
+        if len(self._uncommitted_audio()) > self.max_window_size:
+            agreed = max(agreed, len(segments) - 1)
+
+        if agreed > 0:
+            self.committed_text = self._join_text(self.committed_text, self._extract_text(segments[:agreed]))
+            self.committed_position += int(segments[agreed - 1].t1 * self.sample_rate / 100)  # t1 is in 10ms units
+
+        self.previous_segments = segments[agreed:]
+        return self.previous_segments
+
+    def _process_partial(self) -> Optional[TranscriptionResult]:
+        """Decode only the uncommitted window and return a partial hypothesis if it changed."""
+        self.samples_since_last_partial = 0
+        uncommitted_segments = self._commit_agreed_segments(list(self._transcribe(self._uncommitted_audio())))
+        text = self._join_text(self.committed_text, self._extract_text(uncommitted_segments))
+
+        if text and text != self.last_partial:
+            self.last_partial = text
+            self.logger.info("Partial transcript: %s", text)
+            return TranscriptionResult(text=text, is_final=False)
+        return None
+
+    def _reset_turn(self):
+        """Clear the buffer and all endpointing and streaming state at the end of a turn."""
+        self.audio_buffer.clear()
+        self.vad_engine.start_turn()
+        self.samples_since_last_partial = 0
+        self.committed_text = ""
+        self.committed_position = self.audio_buffer.written
+        self.previous_segments = []
+        self.last_partial = ""
+
+    @staticmethod
+    def _join_text(*parts: Optional[str]) -> str:
+        return ' '.join(part for part in parts if part)
 
     def _extract_text(self, segments: list) -> Optional[str]:
         """Extract and combine text from all segments, filtering out blank audio."""
@@ -89,56 +159,52 @@ class WhisperTranscriptionService(TranscriptionService):
             return ' '.join(valid_segments)
         return None
 
-    def process_audio(self, input_audio_data: str) -> Optional[str]:
+    def process_audio(self, input_audio_data: str) -> Optional[TranscriptionResult]:
         """Process incoming audio chunks and return transcription when appropriate."""
         # Convert audio to proper format
         audio_chunk = self._convert_audio(input_audio_data)
 
         # Add new audio to buffer
-        self.audio_buffer.extend(audio_chunk)
-
-        # Accumulate samples since last silence check
-        self.samples_since_last_check += len(audio_chunk)
-
-        # Check for silence when we've accumulated enough samples
-        if self.samples_since_last_check >= self.samples_per_silence_check:
-            # Get the last segment of audio for silence detection
-            recent_audio = np.array(list(self.audio_buffer))[-self.samples_per_silence_check:]
-            should_process = self._should_process_buffer(recent_audio)
-
-            # Reset the sample counter
-            self.samples_since_last_check = 0
-
-            if should_process and len(self.audio_buffer) > 0:
-                try:
-                    # Convert buffer to numpy array
-                    audio_array = np.array(list(self.audio_buffer))
-
-                    # Only process if we have meaningful audio before the silence
-                    if not self._is_silence(audio_array[:int(len(audio_array) * 0.8)]):
-                        # Log buffer size for debugging
-                        self.logger.info(f"Processing transcription for buffer of size: {len(audio_array)} samples")
-
-                        # Transcribe the audio
-                        result = self.whisper_model.transcribe(audio_array)
-                        text = self._extract_text(result)
-
-                        # Clear the buffer and reset silence detection
-                        self.audio_buffer.clear()
-                        self.silence_start = None
-
-                        # If we got a result different from the last transcription
-                        if text and text != self.last_transcription:
-                            self.last_transcription = text
-                            self.logger.info("Transcribed: %s", text)
-                            return text
-                    else:
-                        # If the buffer was mostly silence, just clear it
-                        self.audio_buffer.clear()
-                        self.silence_start = None
-
-                except Exception as e:
-                    self.logger.error(f"Transcription error: {str(e)}")
-                    self.silence_start = None
+        self.audio_buffer.append(audio_chunk)
+
+        # Accumulate samples since last partial decode
+        self.samples_since_last_partial += len(audio_chunk)
+
+        # Run VAD on the new audio only, the buffer is never rescanned
+        end_of_turn = self.vad_engine.process(audio_chunk)
+
+        if end_of_turn and len(self.audio_buffer) > 0:
+            try:
+                # Only process if we have meaningful speech before the silence
+                if self.vad_engine.turn_speech_samples >= self.min_speech_samples:
+                    # Log buffer size for debugging
+                    self.logger.info(f"Processing transcription for buffer of size: {len(self.audio_buffer)} samples")
+
+                    # Transcribe the audio after the committed prefix (the whole buffer when not streaming)
+                    result = self._transcribe(self._uncommitted_audio())
+                    text = self._join_text(self.committed_text, self._extract_text(result))
+
+                    # Clear the buffer and reset endpointing
+                    self._reset_turn()
+
+                    # If we got a result different from the last transcription
+                    if text and text != self.last_transcription:
+                        self.last_transcription = text
+                        self.logger.info("Transcribed: %s", text)
+                        return TranscriptionResult(text=text)
+                else:
+                    # If the buffer was silence, just clear it
+                    self._reset_turn()
+
+            except Exception as e:
+                self.logger.error(f"Transcription error: {str(e)}")
+                self._reset_turn()
+
+        # While the customer is still speaking emit partial hypotheses from the sliding window
+        elif self.streaming and self.vad_engine.in_speech and self.samples_since_last_partial >= self.samples_per_partial:
+            try:
+                return self._process_partial()
+            except Exception as e:
+                self.logger.error(f"Partial transcription error: {str(e)}")
 
         return None
\ No newline at end of file
@@ -1,33 +1,106 @@
 import logging
 import os
+import re
+from typing import Iterator, List, Optional
 
 import numpy as np
+import torch
 from kokoro import KPipeline
 
+from services.tts.tts_phrase_cache import TtsPhraseCache
 from utilities.logging_utils import configure_logger
 
 
 class KokoroTtsService:
-    def __init__(self):
+    sample_rate = 24000
+
+    # Split on sentence ends as well as newlines so audio can be streamed (and cached) one sentence at a time
+    sentence_split_pattern = r'(?<=[.!?])\s+|\n+'
+
+    def __init__(self, phrase_cache: Optional[TtsPhraseCache] = None, device: Optional[str] = None):
         self.logger = configure_logger('kokoro_tts_service_logger', logging.INFO)
         self.logger.info("Kokoro TTS service initializing...")
 
-        self.pipeline = KPipeline(lang_code='a', device='mps')
+        self.device = self.select_device(device)
+        self.pipeline = KPipeline(lang_code='a', device=self.device)
+        self.voice = os.getenv('TTS_VOICE')
+        self.speed = 1
+
+        self.phrase_cache = phrase_cache or TtsPhraseCache(
+            memory_budget_bytes=int(float(os.getenv('TTS_CACHE_MEMORY_MB', '64')) * 1024 * 1024),
+            disk_directory=os.getenv('TTS_CACHE_DIR')
+        )
+
+        # Synthesize recurring prompts up front, like the pre-recorded greeting
+        prewarm_phrases_file = os.getenv('TTS_PREWARM_PHRASES_FILE')
+        if prewarm_phrases_file and os.path.isfile(prewarm_phrases_file):
+            with open(prewarm_phrases_file) as f:
+                self.prewarm([line for line in f.read().splitlines() if line.strip()])
+
+        self.logger.info(f"Kokoro TTS service initialized on device: {self.device}")
+
+
+    @staticmethod
+    def select_device(device: Optional[str] = None) -> str:
+        """Resolve TTS_DEVICE (cpu, cuda, mps or auto) to the device the pipeline runs on."""
+        device = (device or os.getenv('TTS_DEVICE', 'auto')).lower()
+        if device != 'auto':
+            return device
+        if torch.cuda.is_available():
+            return 'cuda'
+        if torch.backends.mps.is_available():
+            return 'mps'
+        return 'cpu'
+
+
+    def prewarm(self, phrases: List[str]):
+        """Populate the phrase cache so the given phrases cost a lookup instead of synthesis."""
+        for phrase in phrases:
+            for _ in self.generate_audio_stream_from_text(phrase):
+                pass
+        self.logger.info(f"Prewarmed tts cache with {len(phrases)} phrases")
+
+
+    @classmethod
+    def split_sentences(cls, text_to_speak: str) -> List[str]:
+        return [sentence for sentence in re.split(cls.sentence_split_pattern, text_to_speak) if sentence and sentence.strip()]
+
+
+    def _synthesize(self, sentence: str) -> np.ndarray:
+        generator = self.pipeline(text=sentence, voice=self.voice, speed=self.speed)
+        # Audio tensors stay on the pipeline device (cuda/mps) until copied back here
+        return np.concatenate([audio.cpu().numpy() if isinstance(audio, torch.Tensor) else np.asarray(audio)
+                               for _, _, audio in generator if audio is not None])
+
+
+    def synthesize_sentence(self, sentence: str) -> np.ndarray:
+        """Audio for a single sentence, from the phrase cache when possible."""
+        audio = self.phrase_cache.get(sentence, self.voice, self.speed)
+        if audio is None:
+            audio = self._synthesize(sentence)
+            self.phrase_cache.put(sentence, self.voice, self.speed, audio)
+        return audio
+
+
+    def generate_audio_stream_from_text(self, text_to_speak: str) -> Iterator[np.ndarray]:
+        """Yield audio one sentence at a time, from the phrase cache or as soon as it has been synthesized."""
+
+        self.logger.info("Processing tts stream")
+
+        for sentence in self.split_sentences(text_to_speak):
+            yield self.synthesize_sentence(sentence)
 
-        self.logger.info("Kokoro TTS service initialized")
+        self.logger.info("Completed tts stream")
 
 
     def generate_audio_data_from_text(self, text_to_speak: str) -> np.ndarray:
 
         self.logger.info("Processing tts")
-        generator = self.pipeline(text=text_to_speak, voice=os.getenv('TTS_VOICE'), speed=1, split_pattern=r'\n+')
 
-        audio_chunks = []
         # Process each chunk
-        for _, _, audio in generator:
-            audio_chunks.append(audio)
+        audio_chunks = list(self.generate_audio_stream_from_text(text_to_speak))
 
         combined_audio = np.concatenate(audio_chunks)
         self.logger.info("Completed tts")
 
-        return combined_audio
\ No newline at end of file
+        return combined_audio
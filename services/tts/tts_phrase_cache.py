@@ -0,0 +1,110 @@
+import hashlib
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+
+from utilities.logging_utils import configure_logger
+
+
+class TtsPhraseCache:
+    """
+    Two tier cache of synthesized audio keyed by normalized text, voice and speed.
+
+    The memory tier is an LRU bounded by a byte budget. The optional disk tier is a content addressed
+    store of .npy files named by the key hash, so it survives restarts and can be shared between
+    processes. Disk hits are promoted to memory.
+    """
+
+    def __init__(self, memory_budget_bytes: int = 64 * 1024 * 1024, disk_directory: Optional[str] = None):
+        self.logger = configure_logger('tts_phrase_cache_logger', logging.INFO)
+        self.memory_budget_bytes = memory_budget_bytes
+        self.disk_directory = disk_directory
+        if disk_directory:
+            os.makedirs(disk_directory, exist_ok=True)
+
+        self.entries: OrderedDict[str, np.ndarray] = OrderedDict()
+        self.memory_bytes = 0
+        self.lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        # Case and punctuation change Kokoro's pronunciation and prosody so only whitespace is normalized
+        return re.sub(r'\s+', ' ', text).strip()
+
+    def key(self, text: str, voice: str, speed: float) -> str:
+        return hashlib.sha256(f"{voice}|{speed}|{self.normalize_text(text)}".encode('utf-8')).hexdigest()
+
+    def get(self, text: str, voice: str, speed: float) -> Optional[np.ndarray]:
+        key = self.key(text, voice, speed)
+        with self.lock:
+            audio = self.entries.get(key)
+            if audio is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return audio
+
+        audio = self._read_from_disk(key)
+        if audio is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._put_in_memory(key, audio)
+        return audio
+
+    def put(self, text: str, voice: str, speed: float, audio: np.ndarray):
+        key = self.key(text, voice, speed)
+        audio = np.asarray(audio, dtype=np.float32)
+        audio.setflags(write=False)  # Cached arrays are shared by every caller
+        self._put_in_memory(key, audio)
+        self._write_to_disk(key, audio)
+
+    def _put_in_memory(self, key: str, audio: np.ndarray):
+        if audio.nbytes > self.memory_budget_bytes:
+            return
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.memory_bytes -= previous.nbytes
+            self.entries[key] = audio
+            self.memory_bytes += audio.nbytes
+            while self.memory_bytes > self.memory_budget_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.memory_bytes -= evicted.nbytes
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_directory, key[:2], f"{key}.npy")
+
+    def _read_from_disk(self, key: str) -> Optional[np.ndarray]:
+        if not self.disk_directory:
+            return None
+        try:
+            audio = np.load(self._disk_path(key))
+        except (FileNotFoundError, ValueError, OSError):
+            return None
+        audio.setflags(write=False)
+        return audio
+
+    def _write_to_disk(self, key: str, audio: np.ndarray):
+        if not self.disk_directory:
+            return
+        path = self._disk_path(key)
+        if os.path.exists(path):
+            return
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write then rename so concurrent readers never see a partial file
+            temporary_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temporary_path, 'wb') as f:
+                np.save(f, audio)
+            os.replace(temporary_path, path)
+        except OSError as e:
+            self.logger.error(f"Failed to write tts cache entry {key}: {str(e)}")
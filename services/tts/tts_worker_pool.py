@@ -0,0 +1,152 @@
+import asyncio
+import itertools
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import Future
+from typing import AsyncIterable, AsyncIterator, Callable, List, Optional
+
+import numpy as np
+import torch
+
+from services.tts.kokoro_tts_service import KokoroTtsService
+from services.tts.tts_phrase_cache import TtsPhraseCache
+from utilities.logging_utils import configure_logger
+
+
+class TtsWorkerPool:
+    """
+    Runs Kokoro synthesis on worker threads, each with its own preloaded pipeline, behind an async interface.
+
+    Sentences are queued by their position in the response, so the first sentence of any call is
+    synthesized before later sentences of a long response. When a worker picks up a sentence it also
+    takes every copy of the same sentence queued by other calls (looking max_batch_size jobs ahead), so identical
+    prompts queued at the same time share a single model forward pass. Kokoro's model runs one input at
+    a time, so distinct sentences are left in the queue for the other workers to run in parallel.
+    """
+
+    def __init__(self,
+                 tts_service_factory: Optional[Callable[[], KokoroTtsService]] = None,
+                 workers: Optional[int] = None,
+                 max_batch_size: int = 8):
+        self.logger = configure_logger('tts_worker_pool_logger', logging.INFO)
+        self.logger.info("TTS worker pool initializing...")
+
+        workers = workers or int(os.getenv('TTS_WORKERS', '1'))
+        self.max_batch_size = max_batch_size
+
+        torch_threads = os.getenv('TTS_TORCH_THREADS')
+        if torch_threads:
+            torch.set_num_threads(int(torch_threads))
+
+        # Workers share one phrase cache so a sentence synthesized by any worker is a hit for all
+        if tts_service_factory is None:
+            phrase_cache = TtsPhraseCache(
+                memory_budget_bytes=int(float(os.getenv('TTS_CACHE_MEMORY_MB', '64')) * 1024 * 1024),
+                disk_directory=os.getenv('TTS_CACHE_DIR')
+            )
+            tts_service_factory = lambda: KokoroTtsService(phrase_cache=phrase_cache)
+        self.tts_services = [tts_service_factory() for _ in range(workers)]
+        self.sample_rate = self.tts_services[0].sample_rate
+
+        self.pending: queue.PriorityQueue = queue.PriorityQueue()
+        self.sequence = itertools.count()  # Keeps FIFO order between sentences of equal priority
+        self.worker_threads = [threading.Thread(target=self._run_worker, args=(tts_service,), name=f'tts-worker-{index}', daemon=True)
+                               for index, tts_service in enumerate(self.tts_services)]
+        for worker_thread in self.worker_threads:
+            worker_thread.start()
+
+        self.logger.info(f"TTS worker pool initialized with {workers} workers")
+
+    @property
+    def queue_depth(self) -> int:
+        return self.pending.qsize()
+
+    def split_sentences(self, text_to_speak: str) -> List[str]:
+        return self.tts_services[0].split_sentences(text_to_speak)
+
+    def submit(self, sentence: str, priority: int = 0) -> Future:
+        future = Future()
+        self.pending.put((priority, next(self.sequence), sentence, future))
+        return future
+
+    async def synthesize(self, sentence: str, priority: int = 0) -> np.ndarray:
+        return await asyncio.wrap_future(self.submit(sentence, priority))
+
+    async def stream(self, text_to_speak: str) -> AsyncIterator[np.ndarray]:
+        """
+        Yield the response audio sentence by sentence. All sentences are queued up front so idle workers
+        synthesize ahead while the earlier sentences play.
+        """
+        async for audio in self.stream_sentences(self._iterate(self.split_sentences(text_to_speak))):
+            yield audio
+
+    async def stream_sentences(self, sentences: AsyncIterable[str]) -> AsyncIterator[np.ndarray]:
+        """
+        Yield audio for sentences that are still being generated (e.g. by a streaming LLM), in order. Each
+        sentence is queued as soon as it arrives, so synthesis overlaps with generating the rest of the response.
+        """
+        futures: List[asyncio.Future] = []
+        ready: asyncio.Queue = asyncio.Queue()
+
+        async def submit_sentences():
+            try:
+                async for sentence in sentences:
+                    future = asyncio.wrap_future(self.submit(sentence, priority=len(futures)))
+                    futures.append(future)
+                    ready.put_nowait(future)
+            finally:
+                ready.put_nowait(None)
+
+        submit_task = asyncio.create_task(submit_sentences())
+        try:
+            while (future := await ready.get()) is not None:
+                yield await future
+            # Surface errors from the sentence source
+            await submit_task
+        finally:
+            # Stop generating and synthesizing sentences nobody will hear if the consumer goes away
+            submit_task.cancel()
+            for future in futures:
+                future.cancel()
+
+    @staticmethod
+    async def _iterate(sentences: List[str]) -> AsyncIterator[str]:
+        for sentence in sentences:
+            yield sentence
+
+    def _next_batch(self, normalize_text: Callable[[str], str]) -> tuple:
+        """Take the next sentence plus every queued duplicate of it, other queued sentences are put back."""
+        job = self.pending.get()
+        sentence = normalize_text(job[2])
+        batch, others = [job], []
+        while len(batch) + len(others) < self.max_batch_size:
+            try:
+                queued_job = self.pending.get_nowait()
+            except queue.Empty:
+                break
+            (batch if normalize_text(queued_job[2]) == sentence else others).append(queued_job)
+
+        for queued_job in others:
+            self.pending.put(queued_job)
+        return sentence, [future for _, _, _, future in batch]
+
+    def _run_worker(self, tts_service: KokoroTtsService):
+        while True:
+            sentence, futures = self._next_batch(tts_service.phrase_cache.normalize_text)
+            futures = [future for future in futures if future.set_running_or_notify_cancel()]
+            if not futures:
+                continue
+
+            if len(futures) > 1:
+                self.logger.info(f"Synthesizing sentence once for {len(futures)} queued requests ({self.queue_depth} still queued)")
+
+            try:
+                audio = tts_service.synthesize_sentence(sentence)
+                for future in futures:
+                    future.set_result(audio)
+            except Exception as e:
+                self.logger.error(f"TTS error: {str(e)}")
+                for future in futures:
+                    future.set_exception(e)
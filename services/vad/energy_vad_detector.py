@@ -0,0 +1,41 @@
+import numpy as np
+
+from services.vad.vad_detector import VadDetector
+
+
+class EnergyVadDetector(VadDetector):
+    """
+    RMS energy detector with hysteresis and hangover. Speech starts when a frame exceeds
+    start_threshold and only ends after hangover_frames consecutive frames below stop_threshold.
+    """
+
+    def __init__(self,
+                 start_threshold: float = 0.015,
+                 stop_threshold: float = 0.01,
+                 hangover_frames: int = 5):
+        self.start_threshold = start_threshold
+        self.stop_threshold = stop_threshold
+        self.hangover_frames = hangover_frames
+        self.reset()
+
+    def reset(self):
+        self.in_speech = False
+        self.quiet_frames = 0
+
+    def is_speech(self, frames: np.ndarray) -> np.ndarray:
+        rms = np.sqrt(np.mean(np.square(frames, dtype=np.float64), axis=1))
+        decisions = np.empty(len(frames), dtype=bool)
+
+        for index, frame_rms in enumerate(rms):
+            if not self.in_speech:
+                self.in_speech = frame_rms >= self.start_threshold
+                self.quiet_frames = 0
+            elif frame_rms < self.stop_threshold:
+                self.quiet_frames += 1
+                if self.quiet_frames > self.hangover_frames:
+                    self.in_speech = False
+            else:
+                self.quiet_frames = 0
+            decisions[index] = self.in_speech
+
+        return decisions
@@ -0,0 +1,58 @@
+import numpy as np
+
+from services.vad.vad_detector import VadDetector
+
+
+class SpectralFluxVadDetector(VadDetector):
+    """
+    Detector combining zero-crossing rate and spectral flux, gated by an adaptive noise floor.
+    Stationary noise (hum, hiss) has low flux and is absorbed into the noise floor, while speech
+    shows frequent spectral change and a voiced zero-crossing rate.
+    """
+
+    def __init__(self,
+                 energy_ratio: float = 3.0,  # Frame energy over the noise floor required for speech
+                 flux_threshold: float = 0.15,
+                 max_zero_crossing_rate: float = 0.35,
+                 noise_floor_adaptation: float = 0.05,
+                 hangover_frames: int = 5):
+        self.energy_ratio = energy_ratio
+        self.flux_threshold = flux_threshold
+        self.max_zero_crossing_rate = max_zero_crossing_rate
+        self.noise_floor_adaptation = noise_floor_adaptation
+        self.hangover_frames = hangover_frames
+        self.reset()
+
+    def reset(self):
+        self.noise_floor = None  # Seeded from the first frame
+        self.previous_spectrum = None
+        self.hangover = 0
+
+    def is_speech(self, frames: np.ndarray) -> np.ndarray:
+        energy = np.mean(np.square(frames, dtype=np.float64), axis=1)
+        zero_crossing_rate = np.mean(np.abs(np.diff(np.signbit(frames), axis=1)), axis=1)
+
+        # Normalized magnitude spectra so flux measures change in shape rather than loudness
+        spectra = np.abs(np.fft.rfft(frames, axis=1))
+        spectra /= np.maximum(np.sum(spectra, axis=1, keepdims=True), 1e-12)
+
+        decisions = np.empty(len(frames), dtype=bool)
+        for index in range(len(frames)):
+            if self.noise_floor is None:
+                self.noise_floor = max(energy[index], 1e-8)
+            previous = self.previous_spectrum if self.previous_spectrum is not None else spectra[index]
+            flux = np.sum(np.maximum(spectra[index] - previous, 0.0))
+            self.previous_spectrum = spectra[index]
+
+            candidate = (energy[index] > self.noise_floor * self.energy_ratio
+                         and (flux > self.flux_threshold or zero_crossing_rate[index] < self.max_zero_crossing_rate))
+
+            if candidate:
+                self.hangover = self.hangover_frames
+            else:
+                self.noise_floor += self.noise_floor_adaptation * (energy[index] - self.noise_floor)
+                self.hangover = max(0, self.hangover - 1)
+
+            decisions[index] = candidate or self.hangover > 0
+
+        return decisions
@@ -0,0 +1,17 @@
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+
+class VadDetector(ABC):
+    @abstractmethod
+    def is_speech(self, frames: np.ndarray) -> np.ndarray:
+        """
+        Classify a block of consecutive frames, shaped (frame_count, frame_size), as speech or not.
+        Returns a boolean array with one decision per frame. Detectors may keep state across calls.
+        """
+        pass
+
+    def reset(self):
+        """Clear any state carried between frames."""
+        pass
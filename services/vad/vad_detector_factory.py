@@ -0,0 +1,27 @@
+import os
+from typing import Optional
+
+from services.vad.energy_vad_detector import EnergyVadDetector
+from services.vad.frame_classifier_vad_detector import FrameClassifierVadDetector
+from services.vad.spectral_flux_vad_detector import SpectralFluxVadDetector
+from services.vad.vad_detector import VadDetector
+
+
+def create_vad_detector(detector_name: Optional[str] = None) -> VadDetector:
+    """Create a new (per call) VAD detector, selected by VAD_DETECTOR unless a name is given."""
+    detector_name = (detector_name or os.getenv("VAD_DETECTOR", "energy")).lower()
+
+    if detector_name == "spectral_flux":
+        return SpectralFluxVadDetector()
+
+    if detector_name == "classifier":
+        return FrameClassifierVadDetector(weights_file=os.getenv("VAD_CLASSIFIER_WEIGHTS_FILE"))
+
+    if detector_name != "energy":
+        raise ValueError(f"Unknown VAD detector: {detector_name}")
+
+    return EnergyVadDetector(
+        start_threshold=float(os.getenv("VAD_ENERGY_START_THRESHOLD", "0.015")),
+        stop_threshold=float(os.getenv("VAD_ENERGY_STOP_THRESHOLD", "0.01")),
+        hangover_frames=int(os.getenv("VAD_HANGOVER_FRAMES", "5"))
+    )
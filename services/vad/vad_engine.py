@@ -0,0 +1,72 @@
+from typing import List, Tuple
+
+import numpy as np
+
+from services.vad.vad_detector import VadDetector
+
+
+class VadEngine:
+    """
+    Voice activity endpointing driven by a sample clock rather than wall-clock time.
+
+    Incoming audio is cut into fixed size frames (a partial frame is carried over to the next call)
+    and classified by the detector one block at a time, so endpointing depends only on the audio
+    received and is identical when the same audio is replayed. Silence and speech are counted in
+    samples; an endpoint is reached once trailing silence lasts silence_duration.
+    """
+
+    def __init__(self,
+                 detector: VadDetector,
+                 sample_rate: int = 16000,
+                 frame_duration: float = 0.02,  # Seconds per classified frame
+                 silence_duration: float = 0.5,  # Trailing silence that ends a turn (in seconds)
+                 record_decisions: bool = False):  # Keep (sample position, is speech) per frame for replay/debugging
+        self.detector = detector
+        self.frame_size = int(frame_duration * sample_rate)
+        self.silence_samples_required = int(silence_duration * sample_rate)
+        self.record_decisions = record_decisions
+
+        self.pending = np.zeros(self.frame_size, dtype=np.float32)
+        self.pending_count = 0
+        self.position = 0  # Sample clock, samples classified since creation
+        self.decisions: List[Tuple[int, bool]] = []
+
+        self.in_speech = False
+        self.turn_speech_samples = 0
+        self.trailing_silence_samples = 0
+
+    def process(self, samples: np.ndarray) -> bool:
+        """Classify the new samples, returns True once the trailing silence reaches the endpoint."""
+        if self.pending_count:
+            samples = np.concatenate((self.pending[:self.pending_count], samples))
+
+        frame_count = len(samples) // self.frame_size
+        remainder = len(samples) - frame_count * self.frame_size
+        self.pending[:remainder] = samples[len(samples) - remainder:]
+        self.pending_count = remainder
+
+        if frame_count:
+            decisions = self.detector.is_speech(samples[:frame_count * self.frame_size].reshape(frame_count, self.frame_size))
+            for is_speech in decisions:
+                if is_speech:
+                    self.turn_speech_samples += self.frame_size
+                    self.trailing_silence_samples = 0
+                else:
+                    self.trailing_silence_samples += self.frame_size
+                if self.record_decisions:
+                    self.decisions.append((self.position, bool(is_speech)))
+                self.position += self.frame_size
+            self.in_speech = bool(decisions[-1])
+
+        return self.trailing_silence_samples >= self.silence_samples_required
+
+    def start_turn(self):
+        """Reset the per-turn counters once an endpoint has been handled, detector state is kept."""
+        self.turn_speech_samples = 0
+        self.trailing_silence_samples = 0
+
+    def reset(self):
+        self.detector.reset()
+        self.pending_count = 0
+        self.in_speech = False
+        self.start_turn()
@@ -0,0 +1,120 @@
+from math import gcd
+from typing import Optional
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+#####################################################################
+### G.711 u-law (table driven, bit compatible with audioop)
+#####################################################################
+def _build_ulaw_decode_table() -> np.ndarray:
+    ulaw = ~np.arange(256, dtype=np.int32) & 0xFF
+    magnitude = (((ulaw & 0x0F) << 3) + 0x84) << ((ulaw & 0x70) >> 4)
+    pcm = np.where(ulaw & 0x80, 0x84 - magnitude, magnitude - 0x84)
+    return (pcm / 32768.0).astype(np.float32)
+
+
+def _build_ulaw_encode_table() -> np.ndarray:
+    # Indexed by the 14 bit linear value + 8192, matching audioop's st_14linear2ulaw
+    linear = np.arange(-8192, 8192, dtype=np.int32)
+    mask = np.where(linear < 0, 0x7F, 0xFF)
+    magnitude = np.minimum(np.abs(linear), 8159) + 0x21
+    segment = np.searchsorted(np.array([0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF, 0x1FFF]), magnitude)
+    ulaw = np.where(segment >= 8, 0x7F, (segment << 4) | ((magnitude >> (segment + 1)) & 0x0F))
+    return (ulaw ^ mask).astype(np.uint8)
+
+
+ULAW_DECODE_TABLE = _build_ulaw_decode_table()
+ULAW_ENCODE_TABLE = _build_ulaw_encode_table()
+
+
+def ulaw_decode(ulaw_bytes: bytes, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Decode u-law bytes to float32 samples in [-1, 1), optionally into a caller supplied buffer."""
+    indices = np.frombuffer(ulaw_bytes, dtype=np.uint8)
+    if out is not None:
+        out = out[:len(indices)]
+    return np.take(ULAW_DECODE_TABLE, indices, out=out)
+
+
+def ulaw_encode(samples: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Encode float32 samples in [-1, 1] to u-law bytes (as a uint8 array)."""
+    linear = np.floor(np.asarray(samples, dtype=np.float32) * 8192.0)
+    np.clip(linear, -8192, 8191, out=linear)
+    indices = linear.astype(np.int32)
+    indices += 8192
+    if out is not None:
+        out = out[:len(indices)]
+    return np.take(ULAW_ENCODE_TABLE, indices, out=out)
+
+
+def float_to_pcm16(samples: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Convert float32 samples in [-1, 1] to 16 bit linear PCM."""
+    scaled = np.clip(np.asarray(samples, dtype=np.float32) * 32768.0, -32768, 32767)
+    if out is None:
+        return scaled.astype(np.int16)
+    out = out[:len(scaled)]
+    np.copyto(out, scaled, casting='unsafe')
+    return out
+
+
+#####################################################################
+### Streaming polyphase resampler
+#####################################################################
+class StreamingResampler:
+    """
+    Rational polyphase FIR resampler (e.g. 8k -> 16k, 16k -> 24k, 24k -> 8k) that keeps its
+    filter history and output phase between calls, so consecutive frames of a stream are
+    resampled without boundary artifacts. Keep one instance per call and direction.
+    """
+
+    def __init__(self, input_rate: int, output_rate: int, taps_per_phase: int = 16):
+        self.input_rate = input_rate
+        self.output_rate = output_rate
+        divisor = gcd(input_rate, output_rate)
+        self.up = output_rate // divisor
+        self.down = input_rate // divisor
+
+        # Windowed sinc low-pass at the narrower of the two Nyquist bands, designed at the upsampled rate
+        filter_length = taps_per_phase * max(self.up, self.down)
+        self.taps = -(-filter_length // self.up)  # Taps per polyphase branch
+        cutoff = 0.45 / max(self.up, self.down)
+        n = np.arange(self.taps * self.up) - (filter_length - 1) / 2.0
+        prototype = 2 * cutoff * np.sinc(2 * cutoff * n) * self.up
+        prototype[filter_length:] = 0.0
+        prototype[:filter_length] *= np.kaiser(filter_length, 8.0)
+
+        # Branch p holds h[p + k * up]; reversed so it lines up with a forward sliding window of input
+        self.phases = prototype.reshape(self.taps, self.up).T[:, ::-1].astype(np.float32).copy()
+        self.reset()
+
+    def reset(self):
+        self.history = np.zeros(self.taps - 1, dtype=np.float32)
+        self.next_output_time = 0  # Position of the next output sample, in upsampled samples from the current block start
+
+    def max_output_length(self, input_length: int) -> int:
+        return -(-(input_length * self.up) // self.down) + 1
+
+    def process(self, samples: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Resample the next block of the stream, optionally into a caller supplied buffer."""
+        samples = np.asarray(samples, dtype=np.float32)
+        if self.up == self.down:
+            if out is None:
+                return samples
+            np.copyto(out[:len(samples)], samples)
+            return out[:len(samples)]
+
+        extended = np.concatenate((self.history, samples))
+        block_length = len(samples) * self.up
+
+        count = max(0, -(-(block_length - self.next_output_time) // self.down))
+        output_times = self.next_output_time + self.down * np.arange(count)
+        windows = sliding_window_view(extended, self.taps)[output_times // self.up]
+        if out is not None:
+            out = out[:count]
+        resampled = np.einsum('ij,ij->i', windows, self.phases[output_times % self.up], out=out)
+
+        self.next_output_time += count * self.down - block_length
+        if self.taps > 1:
+            self.history = extended[len(extended) - (self.taps - 1):].copy()
+        return resampled
@@ -0,0 +1,64 @@
+import numpy as np
+
+
+class AudioRingBuffer:
+    """
+    Fixed capacity float32 ring buffer for streaming audio.
+
+    Samples are written twice (at i and i + capacity) so any window of up to capacity samples is
+    available as a contiguous zero-copy view.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._samples = np.zeros(2 * capacity, dtype=np.float32)
+
+        self._written = 0  # Total samples written since creation
+        self._length = 0   # Samples currently held
+
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    def written(self) -> int:
+        """Total samples appended since creation, the sample clock of the buffer."""
+        return self._written
+
+    def append(self, samples: np.ndarray):
+        """Append samples, overwriting the oldest ones once capacity is reached."""
+        samples = np.asarray(samples, dtype=np.float32)
+        if len(samples) > self.capacity:
+            # Samples that will never be visible still advance the sample clock
+            self._written += len(samples) - self.capacity
+            samples = samples[-self.capacity:]
+
+        count = len(samples)
+        if count == 0:
+            return
+
+        start = self._written % self.capacity
+        self._write_wrapped(self._samples[:self.capacity], start, samples)
+        self._write_wrapped(self._samples[self.capacity:], start, samples)
+
+        self._written += count
+        self._length = min(self._length + count, self.capacity)
+
+    def view(self) -> np.ndarray:
+        """Zero-copy view of the buffered samples, oldest first."""
+        return self.tail(self._length)
+
+    def tail(self, count: int) -> np.ndarray:
+        """Zero-copy view of the most recent samples."""
+        count = min(count, self._length)
+        end = self._written % self.capacity + self.capacity
+        return self._samples[end - count:end]
+
+    def clear(self):
+        self._length = 0
+
+    @staticmethod
+    def _write_wrapped(target: np.ndarray, start: int, values: np.ndarray):
+        first = min(len(values), len(target) - start)
+        target[start:start + first] = values[:first]
+        if first < len(values):
+            target[:len(values) - first] = values[first:]
@@ -0,0 +1,32 @@
+import logging
+import os
+import time
+from typing import Tuple
+
+
+def sweep_directory(directory: str, suffix: str, retention_seconds: float, quota_bytes: int, logger: logging.Logger) -> Tuple[int, int]:
+    """
+    Apply the retention period, then the quota, to the files in the directory whose names end with the suffix
+    (oldest first). Returns the number of files deleted and the bytes still retained.
+    """
+    swept_files = []
+    for entry in os.scandir(directory):
+        if entry.is_file() and entry.name.endswith(suffix):
+            stat = entry.stat()
+            swept_files.append((stat.st_mtime, stat.st_size, entry.path))
+    swept_files.sort()
+
+    expires_before = time.time() - retention_seconds
+    total_bytes = sum(size for _, size, _ in swept_files)
+    deleted = 0
+    for modified_at, size, path in swept_files:
+        if modified_at >= expires_before and total_bytes <= quota_bytes:
+            break
+        try:
+            os.remove(path)
+            total_bytes -= size
+            deleted += 1
+        except OSError as e:
+            logger.error(f"Failed to delete {path}: {str(e)}")
+
+    return deleted, total_bytes
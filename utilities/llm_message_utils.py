@@ -1,4 +1,5 @@
 import re
+from typing import List
 
 def sanitize_message(msg: str, ) -> str:
 
@@ -15,4 +16,146 @@ def sanitize_message(msg: str, ) -> str:
     # remove leading and trailing whitespace
     msg = msg.strip()
 
-    return msg
\ No newline at end of file
+    return msg
+
+
+class StreamingMessageSanitizer:
+    """
+    Incremental sanitize_message for streamed model output: feed it text chunks as they arrive and it returns
+    the text that is safe to speak so far. Think blocks, bold spans, markdown markers and everything from the
+    stop word on are dropped, and text that could still turn into one of them (e.g. a trailing "TERM") is held
+    back until the next chunk decides it. Like sanitize_message, a "</think>" without an opening tag discards
+    everything before it, so nothing is released before the first sentence is complete without one. A message
+    consisting only of a suppressed word (e.g. an authenticator's "AUTHENTICATED") is held back in full and
+    never released.
+    """
+
+    think_start = "<think>"
+    think_end = "</think>"
+    bold = "**"
+
+    def __init__(self, stop_word: str = "TERMINATE", suppressed_messages: tuple = ("AUTHENTICATED",)):
+        self.stop_word = stop_word
+        self.suppressed_messages = suppressed_messages
+        self.markers = (self.think_start, self.think_end, self.bold, stop_word)
+        self.reset()
+
+    def reset(self):
+        self.pending = ""  # Received text not yet checked against the markers
+        self.held = ""  # Clean text held back until it can no longer be a suppressed message
+        self.in_think = False
+        self.in_bold = False
+        self.stopped = False
+        self.released = False
+        self.last_char = "\n"  # Last character of the sanitized text, markdown markers depend on what precedes them
+
+    def feed(self, chunk: str) -> str:
+        if self.stopped:
+            return ""
+        self.pending += re.sub(r'[^\x00-\x7F]+', '', chunk)
+        return self._release(self._drain(final=False), final=False)
+
+    def flush(self) -> str:
+        """End of the message, returns the remaining speakable text and resets for the next message."""
+        text = self._release(self._drain(final=True) if not self.stopped else "", final=True)
+        self.reset()
+        return text
+
+    def _drain(self, final: bool) -> str:
+        clean_text = ""
+        while self.pending:
+            if self.in_think or self.in_bold:
+                end_marker = self.think_end if self.in_think else self.bold
+                end = self.pending.find(end_marker)
+                if end < 0:
+                    # Keep only what could be the start of the end marker
+                    self.pending = self.pending[-(len(end_marker) - 1):] if not final else ""
+                    break
+                self.pending = self.pending[end + len(end_marker):]
+                self.in_think = self.in_bold = False
+                continue
+
+            found = [(self.pending.find(marker), marker) for marker in self.markers if marker in self.pending]
+            if found:
+                start, marker = min(found)
+                clean_text += self.pending[:start]
+                self.pending = self.pending[start + len(marker):]
+                if marker == self.stop_word:
+                    self.stopped = True
+                    self.pending = ""
+                    break
+                if marker == self.think_end:
+                    # Reasoning without an opening tag, drop everything before it that was not spoken yet
+                    clean_text = ""
+                    if not self.released:
+                        self.held = ""
+                    continue
+                self.in_think = marker == self.think_start
+                self.in_bold = marker == self.bold
+                continue
+
+            # Hold back a suffix that could be the start of a marker
+            holdback = 0 if final else max((length for marker in self.markers for length in range(1, len(marker))
+                                            if self.pending.endswith(marker[:length])), default=0)
+            clean_text += self.pending[:len(self.pending) - holdback]
+            self.pending = self.pending[len(self.pending) - holdback:]
+            break
+
+        return self._strip_markdown(clean_text)
+
+    # Headings and bullets at the start of a line, emphasis stars touching a word, backticks
+    markdown_marker = re.compile(r"(?m)^[ \t]*(?:#+[ \t]*|\*[ \t]+)|\*(?=\S)|(?<=\S)\*|`")
+
+    def _strip_markdown(self, clean_text: str) -> str:
+        """Remove markdown markers, leaving other characters (e.g. the "*" in "a * b") alone."""
+        # Prefixed with a placeholder and the last character sanitized so far, so markers are judged in context
+        text = self.markdown_marker.sub(lambda match: match.group() if match.start() < 2 else "", f"\0{self.last_char}{clean_text}")[2:]
+        if text:
+            self.last_char = text[-1]
+        return text
+
+    def _release(self, clean_text: str, final: bool) -> str:
+        if self.released:
+            return clean_text
+
+        self.held += clean_text
+        candidate = self.held.strip()
+        if final and candidate in self.suppressed_messages:
+            return ""
+        if not final and any(message.startswith(candidate) for message in self.suppressed_messages):
+            return ""
+        # A "</think>" later in the first sentence would still discard it
+        if not final and not re.search(r"[.!?\n]", self.held):
+            return ""
+
+        self.released = True
+        text, self.held = self.held.lstrip(), ""
+        return text
+
+
+class SentenceSegmenter:
+    """Splits streamed text into complete sentences as soon as each sentence's boundary arrives."""
+
+    sentence_boundary = re.compile(r'(?<=[.!?])\s+|\n+')
+    abbreviations = ("mr.", "mrs.", "ms.", "dr.", "st.", "jr.", "sr.", "ave.", "apt.", "no.", "e.g.", "i.e.", "etc.")
+
+    def __init__(self):
+        self.buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        self.buffer += text
+        sentences, start = [], 0
+        for boundary in self.sentence_boundary.finditer(self.buffer):
+            sentence = self.buffer[start:boundary.start()]
+            # "411 Main St. Wilmington" is one sentence
+            if sentence.lower().endswith(self.abbreviations) and not boundary.group().startswith("\n"):
+                continue
+            if sentence.strip():
+                sentences.append(sentence.strip())
+            start = boundary.end()
+        self.buffer = self.buffer[start:]
+        return sentences
+
+    def flush(self) -> List[str]:
+        sentence, self.buffer = self.buffer.strip(), ""
+        return [sentence] if sentence else []